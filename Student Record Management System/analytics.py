@@ -0,0 +1,65 @@
+PERCENTILES = [('P25', 0.25), ('Median', 0.5), ('P75', 0.75)]
+
+# Count, mean, std (population), percentiles and total credits of `values` for
+# every key 0..groups-1 in one pass: a single sort by (key, value) lays each
+# group out contiguously, so percentiles are plain index arithmetic. The sort runs
+# on one composite float key, several times faster than numpy.lexsort.
+def group_stats(keys, values, credits, groups):
+    import numpy as np
+    counts = np.bincount(keys, minlength=groups)
+    present = counts > 0
+    safe = np.maximum(counts, 1)
+    means = np.bincount(keys, weights=values, minlength=groups) / safe
+    deviations = values - means[keys]
+    stds = np.sqrt(np.bincount(keys, weights=deviations * deviations, minlength=groups) / safe)
+    stats = {
+        'Count': counts,
+        'Mean': means,
+        'Std': stds,
+    }
+
+    if len(values):
+        low_value = values.min()
+        ordered = values[np.argsort(keys * (values.max() - low_value + 1) + (values - low_value))]
+    else:
+        ordered = values
+    # Only groups with rows: an empty group at the end would start past the last value
+    starts = (np.cumsum(counts) - counts)[present]
+    for name, q in PERCENTILES:
+        # Linear interpolation between closest ranks, as numpy.percentile does
+        position = starts + (counts[present] - 1) * q
+        low = np.floor(position).astype(np.intp)
+        high = np.ceil(position).astype(np.intp)
+        stats[name] = np.zeros(groups)
+        stats[name][present] = ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+    stats['Credits'] = np.bincount(keys, weights=credits, minlength=groups)
+    return {name: column[present] for name, column in stats.items()}, present
+
+# Per-subject statistics plus pass rate (grades worth any points under `policy`)
+# and a letter-grade histogram, one column per letter of the scale.
+# `subject_ids` indexes `subjects`; scores and credits are floats.
+def subject_report(subject_ids, subjects, scores, credits, policy):
+    import numpy as np
+    groups = len(subjects)
+    letters = policy.letters
+    subject_ids = np.asarray(subject_ids, dtype=np.intp)
+    scores = np.asarray(scores, dtype=np.float64)
+    report, present = group_stats(subject_ids, scores, np.asarray(credits, dtype=np.float64), groups)
+    steps = policy.step_array(scores)
+    histogram = np.bincount(subject_ids * len(letters) + steps,
+                            minlength=groups * len(letters)).reshape(groups, len(letters))[present]
+    report = {'Subject': [subject for subject, keep in zip(subjects, present) if keep], **report}
+    failing = np.asarray(policy.grade_points) == 0
+    report['Pass rate'] = 1 - histogram[:, failing].sum(axis=1) / np.maximum(report['Count'], 1)
+    # Best letter first, as on a transcript
+    for index in range(len(letters) - 1, -1, -1):
+        report[letters[index]] = histogram[:, index]
+    return report
+
+# The same statistics grouped by letter grade instead, best letter first
+def letter_report(scores, credits, policy):
+    import numpy as np
+    scores = np.asarray(scores, dtype=np.float64)
+    report, present = group_stats(policy.step_array(scores), scores, np.asarray(credits, dtype=np.float64), len(policy.letters))
+    report = {'Letter': [letter for letter, keep in zip(policy.letters, present) if keep], **report}
+    return {name: column[::-1] for name, column in report.items()}
@@ -0,0 +1,338 @@
+import re
+import json
+import math
+import asyncio
+import argparse
+from itertools import islice
+from urllib.parse import urlsplit, parse_qs
+from main2 import StudentSystem
+from batch import Batch
+from storage import CsvStorage, SqliteStorage
+from grading import get_policy, POLICY_FILE
+
+STATUS = {200: 'OK', 201: 'Created', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+          409: 'Conflict', 413: 'Payload Too Large', 500: 'Internal Server Error'}
+MAX_BODY = 1024 * 1024
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+# batch.py says what went wrong in the message
+def error_status(message):
+    if 'already exists' in message:
+        return 409
+    if 'not found' in message:
+        return 404
+    return 400
+
+# json.loads and float() both accept NaN and Infinity, which no field can hold
+def finite(value, field):
+    try:
+        value = float(value)
+    except ValueError:
+        raise HttpError(400, f'{field} must be a number')
+    if not math.isfinite(value):
+        raise HttpError(400, f'{field} must be a finite number')
+    return value
+
+def number(body, field, default=None):
+    value = body.get(field, default)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise HttpError(400, f'{field} must be a number')
+    return finite(value, field)
+
+# A non-negative integer query parameter, such as limit or offset
+def count(query, field, default):
+    try:
+        value = int(query.get(field, default))
+    except ValueError:
+        raise HttpError(400, f'{field} must be an integer')
+    if value < 0:
+        raise HttpError(400, f'{field} cannot be negative')
+    return value
+
+def text(body, field):
+    value = body.get(field)
+    if not isinstance(value, str):
+        raise HttpError(400, f'{field} must be a string')
+    return value
+
+def student_json(student):
+    return {'id': student.id, 'name': student.name, 'gpa': round(student.calculate_gpa(), 4)}
+
+# HTTP/1.1 JSON API over a main2 StudentSystem, served by one asyncio event loop
+# so the system is only ever touched from one thread. Reads are answered
+# straight away. Writes (new students and grades) are queued, and one writer
+# task applies everything queued so far - waiting `batch_window` seconds for more
+# first, if set - through Batch validation and a single save, so concurrent
+# clients share one journal flush instead of paying for one each. A write is
+# only answered once the save holding it is done. Every request first catches up
+# with what other processes (the CLI, the web apps) saved, and writes are checked
+# again under the exclusive file lock after the last catch-up.
+#
+#   POST /students                {"id": 7, "name": "Ann Lee"}
+#   GET  /students?q=ann&limit=20 name search; without q, ?offset=&limit= pages the roster
+#   GET  /students/7              the student, GPA and grades
+#   POST /students/7/grades       {"subject": "Math", "score": 91, "credits": 3, "study_hours": 6}
+#   GET  /students/7/gpa
+#   GET  /ranking?limit=10        best GPAs first
+#   GET  /predict?hours=5         score from study hours; &subject=Math&credits=3 adds the subject-aware model
+#   GET  /predict/gpa?hours=0,5,10 average projected next-term GPA for each planned hours
+#   GET  /stats                   roster size and write batching counters
+class ApiServer:
+    def __init__(self, system, batch_window=0.0, max_batch=1000):
+        self.system = system
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.queue = asyncio.Queue()
+        self.writes = 0
+        self.write_batches = 0
+        self.routes = [
+            ('POST', re.compile(r'/students'), self.add_student),
+            ('GET', re.compile(r'/students'), self.list_students),
+            ('GET', re.compile(r'/students/(\d+)'), self.get_student),
+            ('POST', re.compile(r'/students/(\d+)/grades'), self.add_grade),
+            ('GET', re.compile(r'/students/(\d+)/gpa'), self.get_gpa),
+            ('GET', re.compile(r'/ranking'), self.ranking),
+            ('GET', re.compile(r'/predict'), self.predict),
+            ('GET', re.compile(r'/predict/gpa'), self.predict_gpa),
+            ('GET', re.compile(r'/stats'), self.stats),
+        ]
+
+    # Queues a Batch record and waits for the save that includes it
+    async def write(self, record):
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((record, future))
+        return await future
+
+    async def writer(self):
+        while True:
+            items = [await self.queue.get()]
+            if self.batch_window:
+                await asyncio.sleep(self.batch_window)
+            while len(items) < self.max_batch and not self.queue.empty():
+                items.append(self.queue.get_nowait())
+            try:
+                self.commit(items)
+            except Exception as e:
+                for _, future in items:
+                    resolve(future, (500, {'error': f'{type(e).__name__}: {e}'}))
+
+    # Validates each record on its own, so one bad request does not sink the
+    # others, then applies the rest with one save. Both happen under the
+    # exclusive lock, against the roster as the other processes left it.
+    def commit(self, items):
+        system = self.system
+        with system.storage.exclusive(system):
+            batch = Batch(lambda id: system.search_by_id(id) is not None)
+            accepted = []
+            for record, future in items:
+                try:
+                    if record[0] == 'S':
+                        batch.add_student(*record[1:])
+                    else:
+                        batch.add_grade(*record[1:])
+                    accepted.append((record, future))
+                except ValueError as e:
+                    resolve(future, (error_status(str(e)), {'error': str(e)}))
+            if not accepted:
+                return
+            try:
+                system.apply_batch(batch.records)
+            except Exception as e:
+                for _, future in accepted:
+                    resolve(future, (500, {'error': f'could not save: {e}'}))
+                return
+        self.writes += len(accepted)
+        self.write_batches += 1
+        for record, future in accepted:
+            resolve(future, (201, student_json(system.search_by_id(record[1]))))
+
+    async def add_student(self, body, query):
+        if not isinstance(body.get('id'), int) or isinstance(body.get('id'), bool):
+            raise HttpError(400, 'id must be an integer')
+        return await self.write(('S', body['id'], text(body, 'name')))
+
+    async def add_grade(self, id, body, query):
+        record = ('G', int(id), text(body, 'subject'), number(body, 'score'), number(body, 'credits'),
+                  number(body, 'study_hours') if 'study_hours' in body else math.nan)
+        return await self.write(record)
+
+    def find(self, id):
+        student = self.system.search_by_id(int(id))
+        if student is None:
+            raise HttpError(404, f'Student with Id {id} not found')
+        return student
+
+    async def get_student(self, id, body, query):
+        student = self.find(id)
+        return 200, dict(student_json(student), grades=student.grades)
+
+    async def get_gpa(self, id, body, query):
+        student = self.find(id)
+        return 200, {'id': student.id, 'gpa': round(student.calculate_gpa(), 4)}
+
+    async def list_students(self, body, query):
+        limit = min(count(query, 'limit', 20), 1000)
+        if query.get('q', '').strip():
+            found = [self.system.search_by_id(id) for id, _ in self.system.find_by_name(query['q'], limit)]
+        else:
+            offset = count(query, 'offset', 0)
+            found = islice(self.system.iter_students(), offset, offset + limit)
+        return 200, {'students': [student_json(student) for student in found]}
+
+    async def ranking(self, body, query):
+        limit = min(count(query, 'limit', 10), 1000)
+        ranking = self.system.get_ranking()
+        return 200, {'ranked': len(ranking), 'top': [{'id': id, 'rank': ranking.rank(id), 'gpa': round(gpa, 4)}
+                                                     for id, gpa in ranking.top(limit)]}
+
+    async def predict(self, body, query):
+        hours = finite(query.get('hours', ''), 'hours')
+        predictor = self.system.get_predictor()
+        if not predictor.ready():
+            raise HttpError(409, f'Not enough data: {predictor.n} of {predictor.MIN_RECORDS} grades needed')
+        result = {'hours': hours, 'score': round(min(100, max(0, predictor.predict(hours))), 2)}
+        if 'subject' in query:
+            model = self.system.get_cohort_model()
+            credits = finite(query.get('credits', 3), 'credits')
+            result['subject'] = query['subject']
+            result['subject_score'] = round(float(model.predict(hours, credits, 0, [query['subject']])), 2)
+        return 200, result
+
+    async def predict_gpa(self, body, query):
+        hours = [finite(value, 'hours') for value in query.get('hours', '').split(',') if value.strip()]
+        if not hours:
+            raise HttpError(400, 'hours must list at least one number')
+        model = self.system.get_cohort_model()
+        if not model.ready():
+            raise HttpError(409, f'Not enough data: {model.n} of {model.MIN_RECORDS} grades with study hours needed')
+        current, projected = self.system.gpa_projection(hours)
+        if not len(current):
+            raise HttpError(409, 'No grades yet')
+        return 200, {'students': len(current), 'current_gpa': round(float(current.mean()), 4),
+                     'projections': [{'hours': h, 'average_gpa': round(float(gpa), 4)}
+                                     for h, gpa in zip(hours, projected.mean(axis=0))]}
+
+    async def stats(self, body, query):
+        return 200, {'students': len(self.system.students), 'grades': len(self.system.store),
+                     'writes': self.writes, 'write_batches': self.write_batches}
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        path = url.path.rstrip('/') or '/'
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        wrong_method = False
+        for route_method, pattern, handler in self.routes:
+            match = pattern.fullmatch(path)
+            if not match:
+                continue
+            if route_method != method:
+                wrong_method = True
+                continue
+            try:
+                data = json.loads(body) if body else {}
+                if not isinstance(data, dict):
+                    raise HttpError(400, 'the body must be a JSON object')
+                self.system.refresh()
+                return await handler(*match.groups(), body=data, query=query)
+            except HttpError as e:
+                return e.status, {'error': str(e)}
+            except ValueError as e:
+                return 400, {'error': str(e)}
+            except Exception as e:
+                return 500, {'error': f'{type(e).__name__}: {e}'}
+        if wrong_method:
+            return 405, {'error': f'{method} not allowed on {path}'}
+        return 404, {'error': f'no route for {path}'}
+
+    # One client connection; requests on it are answered in order (keep-alive)
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = lines[0].split(' ', 2)
+                    headers = dict((name.strip().lower(), value.strip())
+                                   for name, value in (line.split(':', 1) for line in lines[1:] if line))
+                    length = int(headers.get('content-length', 0))
+                except ValueError:
+                    writer.write(response(400, {'error': 'malformed request'}, False))
+                    break
+                if length > MAX_BODY:
+                    writer.write(response(413, {'error': 'body too large'}, False))
+                    break
+                body = await reader.readexactly(length) if length else b''
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                status, payload = await self.dispatch(method, target, body)
+                writer.write(response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle, host, port)
+        writer = asyncio.create_task(self.writer())
+        print(f'Listening on http://{host}:{server.sockets[0].getsockname()[1]}', flush=True)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            writer.cancel()
+
+# The waiting client may have gone away (its future cancelled)
+def resolve(future, result):
+    if not future.done():
+        future.set_result(result)
+
+def response(status, payload, keep_alive):
+    try:
+        body = json.dumps(payload, allow_nan=False).encode('utf-8')
+    except ValueError:
+        # A NaN or infinity slipped into a result; JSON has no way to spell it
+        status, body = 500, b'{"error": "the result is not a finite number"}'
+    head = (f'HTTP/1.1 {status} {STATUS[status]}\r\nContent-Type: application/json\r\n'
+            f'Content-Length: {len(body)}\r\nConnection: {"keep-alive" if keep_alive else "close"}\r\n\r\n')
+    return head.encode('latin-1') + body
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='HTTP/JSON API over the student records')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000, help='0 picks a free port')
+    parser.add_argument('--db', help='use this SQLite database instead of student_records.csv')
+    parser.add_argument('--workers', type=int, help='processes that parse a large student_records.csv (default: all cores)')
+    parser.add_argument('--batch-window', type=float, default=0.0, metavar='MS',
+                        help='how long a write waits for others to share its save (default: 0, whatever is already queued)')
+    parser.add_argument('--scale', help='grading scale to use for GPAs and letters (default: Standard 4.0)')
+    parser.add_argument('--grading', metavar='JSON', default=POLICY_FILE, help='file the --scale is read from')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    try:
+        policy = get_policy(args.scale, args.grading)
+    except (OSError, ValueError) as e:
+        print(f'Could not load grading scale: {e}')
+        return
+    storage = SqliteStorage(args.db) if args.db else CsvStorage(workers=args.workers)
+    system = StudentSystem(storage, policy)
+    system.load_data()
+    try:
+        asyncio.run(ApiServer(system, args.batch_window / 1000).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        system.compact()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+import math
+
+# Buffers add_student/add_grade calls as journal-style records, ('S', id, name)
+# and ('G', id, subject, score, credits, study_hours), checking each one as it
+# comes in. StudentSystem.batch() applies the records with a single save once the
+# block ends; a ValueError (or any exception) inside the block discards them all.
+# `exists(id)` tells whether the system already has a student.
+class Batch:
+    def __init__(self, exists):
+        self.exists = exists
+        self.records = []
+        self.new_ids = set()
+
+    def __len__(self):
+        return len(self.records)
+
+    def known(self, id):
+        return id in self.new_ids or self.exists(id)
+
+    def add_student(self, id, name):
+        if not isinstance(id, int) or id <= 0:
+            raise ValueError('Id must be a positive integer')
+        if not isinstance(name, str) or not name.strip():
+            raise ValueError('Name cannot be empty')
+        if self.known(id):
+            raise ValueError(f'Student with Id {id} already exists')
+        self.new_ids.add(id)
+        self.records.append(('S', id, name.strip()))
+
+    # Study hours default to NaN: not recorded
+    def add_grade(self, id, subject, score, credits, study_hours=math.nan):
+        if not self.known(id):
+            raise ValueError(f'Student with Id {id} not found')
+        if not isinstance(subject, str) or not subject.strip():
+            raise ValueError('Subject name cannot be empty')
+        if not 0 <= score <= 100:
+            raise ValueError(f'{subject}: score must be between 0 and 100')
+        if not credits > 0:
+            raise ValueError(f'{subject}: credits must be above zero')
+        if study_hours < 0:
+            raise ValueError(f'{subject}: study hours cannot be negative')
+        self.records.append(('G', id, subject.strip(), score, credits, study_hours))
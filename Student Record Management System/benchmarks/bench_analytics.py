@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analytics import subject_report, letter_report
+from grading import DEFAULT_POLICY, load_policies
+
+STATS = ['Count', 'Mean', 'Std', 'P25', 'Median', 'P75', 'Credits']
+
+# The same statistics with a pandas groupby, groups in `order`
+def pandas_stats(frame, key, order):
+    grouped = frame.groupby(key)
+    expected = pd.DataFrame({
+        'Count': grouped['Score'].count(),
+        'Mean': grouped['Score'].mean(),
+        'Std': grouped['Score'].std(ddof=0),
+        'P25': grouped['Score'].quantile(0.25),
+        'Median': grouped['Score'].quantile(0.5),
+        'P75': grouped['Score'].quantile(0.75),
+        'Credits': grouped['Credits'].sum(),
+    })
+    return expected.reindex([name for name in order if name in expected.index])
+
+def same(report, key, expected):
+    return (list(report[key]) == list(expected.index)
+            and all(np.allclose(report[name], expected[name]) for name in STATS))
+
+# Checks both reports against pandas on one data set
+def check(subject_ids, subjects, scores, credits, policy):
+    frame = pd.DataFrame({'Subject': [subjects[i] for i in subject_ids], 'Score': scores, 'Credits': credits})
+    frame['Letter'] = policy.letter_array(scores) if len(scores) else []
+    subjects_report = subject_report(subject_ids, subjects, scores, credits, policy)
+    letters_report = letter_report(scores, credits, policy)
+    return (same(subjects_report, 'Subject', pandas_stats(frame, 'Subject', subjects))
+            and same(letters_report, 'Letter', pandas_stats(frame, 'Letter', policy.letters[::-1])))
+
+# Random data, plus the edge cases: no grade reaching the top letter (the last,
+# empty group), a single grade, no grades at all, and another scale
+def cases(grades, rng):
+    subjects = [f'Subject {k}' for k in range(20)]
+    ids = rng.integers(0, len(subjects), grades)
+    scores = rng.integers(0, 101, grades).astype(np.float64)
+    credits = rng.integers(1, 5, grades).astype(np.float64)
+    yield 'random', ids, subjects, scores, credits, DEFAULT_POLICY
+    yield 'no A grades', ids, subjects, np.minimum(scores, 89.0), credits, DEFAULT_POLICY
+    yield 'one grade of 80', np.array([0]), ['Math'], np.array([80.0]), np.array([3.0]), DEFAULT_POLICY
+    yield 'unused subject', np.array([1, 1]), ['Art', 'Math'], np.array([50.0, 70.0]), np.array([3.0, 3.0]), DEFAULT_POLICY
+    yield 'no grades', np.array([], dtype=np.intp), [], np.array([]), np.array([]), DEFAULT_POLICY
+    for name, policy in load_policies().items():
+        yield f'{name}, no top letter', ids, subjects, np.minimum(scores, policy.bounds[-1] - 1), credits, policy
+
+def main():
+    parser = argparse.ArgumentParser(description='Time the subject and letter reports and check them against pandas')
+    parser.add_argument('--grades', type=int, default=1000000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    failed = []
+    for name, ids, subjects, scores, credits, policy in cases(args.grades, rng):
+        if not check(ids, subjects, scores, credits, policy):
+            failed.append(name)
+
+    ids, subjects, scores, credits, policy = next(cases(args.grades, rng))[1:]
+    start = time.perf_counter()
+    subject_report(ids, subjects, scores, credits, policy)
+    letter_report(scores, credits, policy)
+    elapsed = time.perf_counter() - start
+    print(f'{args.grades:,} grades: subject and letter reports in {elapsed * 1000:.1f} ms')
+    if failed:
+        sys.exit(f'FAIL: differs from pandas for: {", ".join(failed)}')
+    print('OK: same as pandas groupby, including empty groups')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+import os
+import sys
+import time
+import random
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from main2 import StudentSystem
+from predictor import CohortModel
+
+# Scores that depend on study hours, credits and the subject, plus noise
+def build_system(students, subjects, per_student=10):
+    rng = random.Random(0)
+    system = StudentSystem()
+    difficulty = [rng.uniform(-10, 10) for _ in range(subjects)]
+    for id in range(1, students + 1):
+        student = system.new_student(id, f'student {id}')
+        for _ in range(per_student):
+            subject, credits, hours = rng.randrange(subjects), rng.randint(1, 4), rng.uniform(0, 20)
+            score = min(100, max(0, 40 + 2.5 * hours - 1.5 * credits + difficulty[subject] + rng.gauss(0, 8)))
+            student.add_grade(f'Subject {subject}', score, credits, hours)
+    return system
+
+# One student's projection the way a per-click predictor would get it: a predict() per grade
+def project_one(system, model, student, planned_hours):
+    subjects = {name: i for i, name in enumerate(model.subjects)}
+    row = []
+    for hours in planned_hours:
+        points = 0.0
+        for grade in student.grades:
+            score = float(model.predict(hours, grade['Credits'], subjects[grade['Subject']]))
+            points += system.policy.points(score) * grade['Credits']
+        row.append(points / student.total_credits if student.total_credits else 0.0)
+    return row
+
+# A subject whose grades all lack study hours has nothing to fit: it must be
+# predicted like a subject never seen (the average of the fitted ones), not
+# with the 0 intercept lstsq would give an empty subject
+def blank_subject_ok():
+    rng = np.random.default_rng(0)
+    subject = rng.integers(0, 3, 3000)
+    hours = rng.uniform(0, 20, 3000)
+    credits = rng.integers(1, 5, 3000).astype(np.float64)
+    score = 40 + 2.5 * hours - 1.5 * credits + np.array([0.0, 10.0, 5.0])[subject] + rng.normal(0, 8, 3000)
+    hours[subject == 2] = np.nan
+    model = CohortModel.fit(subject, ['Math', 'Physics', 'Art'], score, credits, hours)
+    fitted = model.predict(10, 3, [0, 1], ['Math', 'Physics'])
+    art, unseen = model.predict(10, 3, [0, 1], ['Art', 'Never taken'])
+    return model.subjects == ['Math', 'Physics'] and art == unseen and np.isclose(art, fitted.mean())
+
+# Fit and whole-roster projection of the multi-feature predictor, checked against
+# scikit-learn on an explicit one-hot matrix and a grade-by-grade loop over a sample
+def main():
+    parser = argparse.ArgumentParser(description='Time CohortModel.fit and project_gpas over a whole roster')
+    parser.add_argument('--students', type=int, default=100000)
+    parser.add_argument('--subjects', type=int, default=40)
+    parser.add_argument('--hours', type=float, nargs='+', default=[0, 5, 10, 15, 20])
+    parser.add_argument('--sample', type=int, default=500, help='students checked against the per-grade loop')
+    args = parser.parse_args()
+
+    system = build_system(args.students, args.subjects)
+    print(f'{len(system.store):,} grades, {args.students:,} students, {args.subjects} subjects, {len(args.hours)} planned hours')
+
+    start = time.perf_counter()
+    model = system.get_cohort_model()
+    fit_time = time.perf_counter() - start
+    start = time.perf_counter()
+    projected = system.project_gpas(args.hours)
+    project_time = time.perf_counter() - start
+
+    from sklearn.linear_model import LinearRegression
+    columns = system.store.columns()
+    onehot = np.zeros((len(system.store), len(system.store.subjects)))
+    onehot[np.arange(len(system.store)), columns['subject']] = 1
+    features = np.column_stack([columns['study_hours'], columns['credits'], onehot])
+    reference = LinearRegression(fit_intercept=False).fit(features, columns['score'])
+    same_fit = np.allclose(reference.coef_, model.coefficients, rtol=1e-6, atol=1e-6)
+
+    sample = list(system.students.values())[:args.sample]
+    start = time.perf_counter()
+    looped = [project_one(system, model, student, args.hours) for student in sample]
+    loop_time = (time.perf_counter() - start) * args.students / len(sample)
+    same_projection = np.allclose(projected[:len(sample)], looped)
+
+    print(f'  fit                  {fit_time * 1000:>9.1f} ms')
+    print(f'  project_gpas         {project_time * 1000:>9.1f} ms  ({len(projected) * len(args.hours):,} student x hours GPAs)')
+    print(f'  per-grade loop (est) {loop_time * 1000:>9.0f} ms  (x{loop_time / project_time:.0f} slower)')
+    if not same_fit:
+        sys.exit('FAIL: the fit disagrees with scikit-learn')
+    if not same_projection:
+        sys.exit('FAIL: project_gpas disagrees with the per-grade loop')
+    if not blank_subject_ok():
+        sys.exit('FAIL: a subject without study hours is not predicted like an unseen one')
+    print('OK: same coefficients as scikit-learn, same GPAs as the loop, subjects without study hours treated as unseen')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+import io
+import os
+import sys
+import time
+import argparse
+import tempfile
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from roster import write_roster
+from main2 import StudentSystem
+from binary_snapshot import binary_filename
+
+def load():
+    system = StudentSystem()
+    with redirect_stdout(io.StringIO()):
+        system.load_data()
+    return system
+
+def timed(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def summary(system):
+    return [(s.id, s.name, s.calculate_gpa(), s.grades) for s in system.students.values()]
+
+# Cold start of main2 from the CSV alone versus from the binary snapshot that
+# compact() writes next to it, checking both give the same roster. Nothing is
+# journaled here so the snapshot is written directly
+def main():
+    parser = argparse.ArgumentParser(description='Compare CSV parsing with the binary snapshot on load_data')
+    parser.add_argument('--students', type=int, default=100000)
+    parser.add_argument('--subjects', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            rows = write_roster('student_records.csv', args.students, args.subjects)
+            csv_time, from_csv = timed(load, args.repeat)
+            from_csv.storage.write_snapshot(from_csv)
+            size = os.path.getsize(binary_filename('student_records.csv'))
+            bin_time, from_bin = timed(load, args.repeat)
+            same = summary(from_csv) == summary(from_bin)
+            same = same and from_csv.get_predictor().coefficients() == from_bin.get_predictor().coefficients()
+        finally:
+            os.chdir(cwd)
+
+    print(f'{rows:,} grades, {args.students:,} students')
+    print(f'  CSV parse       {csv_time * 1000:>10.1f} ms')
+    print(f'  binary snapshot {bin_time * 1000:>10.1f} ms  ({size / 1e6:.1f} MB, x{csv_time / bin_time:.0f} faster)')
+    if not same:
+        sys.exit('FAIL: the binary snapshot loads a different roster')
+    print('OK: same roster either way')
+
+if __name__ == '__main__':
+    main()
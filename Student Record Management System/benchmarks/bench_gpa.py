@@ -0,0 +1,53 @@
+import os
+import sys
+import time
+import random
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from main2 import StudentSystem
+
+def build_system(grades, per_student=10):
+    random.seed(0)
+    system = StudentSystem()
+    for id in range(1, grades // per_student + 1):
+        system.new_student(id, f'student {id}')
+    ids = list(system.students)
+    for n in range(grades):
+        system.students[ids[n % len(ids)]].add_grade(f'Subject {n % 40}', random.uniform(40, 100), random.randint(1, 4), random.uniform(0, 20))
+    return system
+
+# The original calculate_gpa: a pass over the student's grades on every call
+def rescan_gpa(student):
+    total_points = 0
+    total_credits = 0
+    for grade in student.grades:
+        total_points += student.get_grade_points(grade['Score']) * grade['Credits']
+        total_credits += grade['Credits']
+    return total_points / total_credits if total_credits else 0.0
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return np.array(result), time.perf_counter() - start
+
+# Every student's GPA three ways: rescanning the grades per student (the original
+# calculate_gpa), recomputing them in one vectorized pass (compute_all_gpas), and
+# reading the running totals add_grade keeps (today's calculate_gpa)
+def main():
+    print(f"{'grades':>10} {'rescan':>10} {'compute_all_gpas':>18} {'calculate_gpa':>15} {'vectorized vs rescan':>22}")
+    for grades in (10_000, 100_000, 1_000_000):
+        system = build_system(grades)
+        students = list(system.students.values())
+        rescanned, rescan_time = timed(lambda: [rescan_gpa(student) for student in students])
+        bulk, bulk_time = timed(system.compute_all_gpas)
+        totals, totals_time = timed(lambda: [student.calculate_gpa() for student in students])
+
+        if not (np.allclose(bulk, rescanned) and np.allclose(totals, rescanned)):
+            sys.exit(f'FAIL: the three GPAs disagree at {grades} grades')
+        print(f'{grades:>10} {rescan_time * 1000:>8.1f}ms {bulk_time * 1000:>16.1f}ms {totals_time * 1000:>13.1f}ms '
+              f'{rescan_time / bulk_time:>21.1f}x')
+    print('OK: all three agree')
+
+if __name__ == '__main__':
+    main()
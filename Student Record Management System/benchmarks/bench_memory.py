@@ -0,0 +1,83 @@
+import gc
+import os
+import sys
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main2
+from grade_store import GradeStore
+
+# The Student of the original main2.py: a __dict__ per student and a dict per grade
+class DictStudent:
+    def __init__(self, id, name):
+        self.id = id
+        self.name = name
+        self.grades = []
+
+    def add_grade(self, subject, score, credits, study_hours):
+        self.grades.append({
+            'Subject': subject,
+            'Score': score,
+            'Credits': credits,
+            'StudyHours': study_hours
+        })
+
+# Today's Student, minus __slots__
+class UnslottedStudent(main2.Student):
+    pass
+
+def build_dicts(students, subjects):
+    roster = {}
+    for id in range(1, students + 1):
+        student = roster[id] = DictStudent(id, f'student {id}')
+        for k in range(subjects):
+            # A fresh string per row, as csv parsing produces
+            student.add_grade(f'Subject {k}', float(40 + k), 3.0, 1.5)
+    return roster
+
+def build_store(student_class):
+    def build(students, subjects):
+        store = GradeStore()
+        roster = {}
+        for id in range(1, students + 1):
+            student = roster[id] = student_class(id, f'student {id}', store, id - 1)
+            for k in range(subjects):
+                student.add_grade(f'Subject {k}', float(40 + k), 3.0, 1.5)
+        return roster, store
+    return build
+
+LAYOUTS = [
+    ('original (dict per grade)', build_dicts),
+    ('GradeStore, no __slots__', build_store(UnslottedStudent)),
+    ('GradeStore + __slots__', build_store(main2.Student)),
+]
+
+# Bytes still allocated once the roster is built (and kept alive)
+def retained(build, students, subjects):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    roster = build(students, subjects)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del roster
+    return after - before
+
+def main():
+    parser = argparse.ArgumentParser(description='Bytes per student and per grade of each in-memory layout')
+    parser.add_argument('--students', type=int, default=100000)
+    parser.add_argument('--subjects', type=int, default=10)
+    args = parser.parse_args()
+
+    print(f'{args.students:,} students, {args.subjects} grades each')
+    # Per student without grades, per grade on top of that, and per student with all its grades
+    print(f"  {'layout':<28}{'no grades':>11}{'per grade':>11}{'graded':>9}{'total MB':>10}   (bytes)")
+    for name, build in LAYOUTS:
+        empty = retained(build, args.students, 0)
+        full = retained(build, args.students, args.subjects)
+        per_grade = (full - empty) / (args.students * args.subjects)
+        print(f'  {name:<28}{empty / args.students:>11.0f}{per_grade:>11.1f}{full / args.students:>9.0f}{full / 1e6:>10.1f}')
+
+if __name__ == '__main__':
+    main()
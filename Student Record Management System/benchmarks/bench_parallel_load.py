@@ -0,0 +1,76 @@
+import io
+import os
+import sys
+import time
+import argparse
+import tempfile
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from roster import write_roster
+from main2 import StudentSystem
+from storage import CsvStorage
+from parallel_csv import load_parallel
+
+def load(workers):
+    system = StudentSystem(CsvStorage(workers=1))
+    with redirect_stdout(io.StringIO()):
+        if workers == 1:
+            system.load_data()
+        else:
+            # Straight to the parallel loader, whatever the file size
+            load_parallel(system.filename, system, workers)
+    return system
+
+def timed(workers, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        system = load(workers)
+        best = min(best, time.perf_counter() - start)
+    return best, system
+
+def summary(system):
+    return [(s.id, s.name, round(s.calculate_gpa(), 9), s.grades) for s in system.students.values()]
+
+def same_predictor(a, b):
+    return all(abs(x - y) <= 1e-9 * max(1.0, abs(x)) for x, y in zip(a.coefficients(), b.coefficients()))
+
+# load_data parsing student_records.csv in one process versus the parallel
+# loader with 2, 4, ... workers, checking every run gives the same roster
+def main():
+    parser = argparse.ArgumentParser(description='Speedup of the parallel CSV loader over the sequential one')
+    parser.add_argument('--students', type=int, default=200000)
+    parser.add_argument('--subjects', type=int, default=10)
+    parser.add_argument('--workers', type=int, nargs='+', default=[2, 4, 8])
+    parser.add_argument('--repeat', type=int, default=2)
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            rows = write_roster('student_records.csv', args.students, args.subjects)
+            size = os.path.getsize('student_records.csv')
+            base_time, base = timed(1, args.repeat)
+            expected = summary(base)
+            for workers in args.workers:
+                elapsed, system = timed(workers, args.repeat)
+                same = summary(system) == expected and same_predictor(base.get_predictor(), system.get_predictor())
+                results.append((workers, elapsed, same))
+        finally:
+            os.chdir(cwd)
+
+    print(f'{rows:,} grades, {args.students:,} students, {size / 1e6:.0f} MB, {os.cpu_count()} cores')
+    print(f"  {'workers':>7}{'time ms':>10}{'speedup':>9}{'efficiency':>12}")
+    print(f"  {1:>7}{base_time * 1000:>10.0f}{1:>8.2f}x{100:>11.0f}%")
+    for workers, elapsed, same in results:
+        speedup = base_time / elapsed
+        print(f"  {workers:>7}{elapsed * 1000:>10.0f}{speedup:>8.2f}x{100 * speedup / workers:>11.0f}%")
+    if not all(same for _, _, same in results):
+        sys.exit('FAIL: the parallel loader built a different roster')
+    print('OK: same roster with every worker count')
+
+if __name__ == '__main__':
+    main()
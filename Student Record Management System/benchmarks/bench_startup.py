@@ -0,0 +1,50 @@
+import os
+import sys
+import argparse
+import subprocess
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must only be imported once prediction or analytics actually run
+HEAVY = ('pandas', 'numpy', 'sklearn', 'scipy', 'streamlit')
+
+# Cold-imports `module` in a fresh interpreter with -X importtime and returns
+# its cumulative import time in ms plus every module that got imported
+def import_profile(module):
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=APP_DIR, capture_output=True, text=True, check=True)
+    total = None
+    modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|')
+        name = name.strip()
+        modules.add(name.split('.')[0])
+        if name == module:
+            total = int(cumulative) / 1000
+    return total, modules
+
+def main():
+    parser = argparse.ArgumentParser(description='Guard the cold-start import time of the CLI')
+    parser.add_argument('--module', default='main2')
+    parser.add_argument('--budget-ms', type=float, default=100.0)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    times = []
+    for _ in range(args.runs):
+        total, modules = import_profile(args.module)
+        times.append(total)
+    best = min(times)
+    print(f'import {args.module}: best {best:.1f}ms, worst {max(times):.1f}ms over {args.runs} runs (budget {args.budget_ms:.0f}ms)')
+
+    heavy = sorted(name for name in modules if name in HEAVY)
+    if heavy:
+        sys.exit(f'FAIL: {args.module} imports {", ".join(heavy)} at startup')
+    if best > args.budget_ms:
+        sys.exit(f'FAIL: {args.module} takes {best:.1f}ms to import, over the {args.budget_ms:.0f}ms budget')
+    print('OK')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from roster import write_roster
+
+SERVER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'api_server.py')
+
+# A keep-alive HTTP/1.1 connection sending JSON requests one at a time
+class Client:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, host, port):
+        return cls(*await asyncio.open_connection(host, port))
+
+    async def request(self, method, path, payload=None):
+        body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+        self.writer.write(f'{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n'.encode('latin-1') + body)
+        await self.writer.drain()
+        head = (await self.reader.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+        length = next(int(line.split(':', 1)[1]) for line in head if line.lower().startswith('content-length:'))
+        return int(head[0].split(' ', 2)[1]), json.loads(await self.reader.readexactly(length))
+
+    def close(self):
+        self.writer.close()
+
+# One simulated user: a mix of GPA lookups, name searches, student pages and
+# new grades (a `write_share` of the requests) until `deadline`
+async def user(host, port, students, write_share, deadline, latencies, errors, seed):
+    rng = random.Random(seed)
+    client = await Client.connect(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            id = rng.randint(1, students)
+            roll = rng.random()
+            if roll < write_share:
+                request = ('POST', f'/students/{id}/grades', {'subject': f'Subject {rng.randrange(10)}', 'score': rng.randint(40, 100),
+                                                               'credits': rng.randint(1, 4), 'study_hours': rng.randint(0, 20)})
+            elif roll < write_share + (1 - write_share) / 2:
+                request = ('GET', f'/students/{id}/gpa', None)
+            elif roll < write_share + 3 * (1 - write_share) / 4:
+                request = ('GET', f'/students?q=student+{id}&limit=5', None)
+            else:
+                request = ('GET', f'/students/{id}', None)
+            start = time.perf_counter()
+            status, _ = await client.request(*request)
+            latencies.append(time.perf_counter() - start)
+            if status >= 400:
+                errors.append(status)
+    finally:
+        client.close()
+
+async def stats(host, port):
+    client = await Client.connect(host, port)
+    try:
+        return (await client.request('GET', '/stats'))[1]
+    finally:
+        client.close()
+
+async def run_level(host, port, concurrency, students, write_share, duration):
+    latencies, errors = [], []
+    before = await stats(host, port)
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*(user(host, port, students, write_share, deadline, latencies, errors, seed)
+                           for seed in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    after = await stats(host, port)
+    batches = after['write_batches'] - before['write_batches']
+    per_batch = (after['writes'] - before['writes']) / batches if batches else 0.0
+    return len(latencies), elapsed, sorted(latencies), len(errors), per_batch
+
+def percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+# Starts api_server.py on a synthetic roster in a scratch directory and drives it
+# with more and more concurrent keep-alive clients, reporting requests per
+# second, p50/p99 latency and how many writes shared each save
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the HTTP API at increasing concurrency')
+    parser.add_argument('--students', type=int, default=10000)
+    parser.add_argument('--subjects', type=int, default=5)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16, 64])
+    parser.add_argument('--duration', type=float, default=3.0, help='seconds per concurrency level')
+    parser.add_argument('--write-share', type=float, default=0.2, help='fraction of requests that add a grade')
+    parser.add_argument('--batch-window', type=float, default=0.0, metavar='MS', help='passed on to api_server.py')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        write_roster(os.path.join(workdir, 'student_records.csv'), args.students, args.subjects)
+        server = subprocess.Popen([sys.executable, SERVER, '--port', '0', '--batch-window', str(args.batch_window)],
+                                  cwd=workdir, stdout=subprocess.PIPE, text=True)
+        try:
+            line = server.stdout.readline()
+            if not line.startswith('Listening on http://'):
+                sys.exit(f'FAIL: the server did not start ({line.strip()!r})')
+            host, port = line.split('//', 1)[1].strip().rsplit(':', 1)
+            print(f'{args.students:,} students, {args.write_share:.0%} writes, {args.duration:g} s per level')
+            print(f"  {'clients':>7}{'requests':>10}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}{'writes/save':>13}")
+            for concurrency in args.concurrency:
+                count, elapsed, ordered, errors, per_batch = asyncio.run(
+                    run_level(host, int(port), concurrency, args.students, args.write_share, args.duration))
+                print(f'  {concurrency:>7}{count:>10,}{count / elapsed:>9.0f}{percentile(ordered, 0.5) * 1000:>9.2f}'
+                      f'{percentile(ordered, 0.99) * 1000:>9.2f}{errors:>8}{per_batch:>13.1f}')
+        finally:
+            server.terminate()
+            server.wait()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,19 @@
+import csv
+import random
+
+# Synthetic student_records.csv: `students` rows of `subjects` grades each, in the
+# layout main2.py and webapp.py write (optionally without the StudyHours column).
+def write_roster(filename, students, subjects, study_hours=True, seed=0):
+    rng = random.Random(seed)
+    header = ['ID', 'Name', 'Subject', 'Score', 'Credits'] + (['StudyHours'] if study_hours else [])
+    with open(filename, mode='w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(header)
+        for id in range(1, students + 1):
+            name = f'student {id}'
+            for subject in range(subjects):
+                hours = round(rng.uniform(0, 20), 1)
+                score = min(100, max(0, round(45 + 2.5 * hours + rng.gauss(0, 10))))
+                row = [id, name, f'Subject {subject}', score, rng.randint(1, 4)]
+                writer.writerow(row + [hours] if study_hours else row)
+    return students * subjects
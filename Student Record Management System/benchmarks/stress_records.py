@@ -0,0 +1,123 @@
+import io
+import os
+import sys
+import time
+import argparse
+import tempfile
+import multiprocessing
+from contextlib import redirect_stdout
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+FILENAME = 'student_records.csv'
+
+def open_system(compact_every):
+    from main2 import StudentSystem
+    from storage import CsvStorage
+    with redirect_stdout(io.StringIO()):
+        system = StudentSystem(CsvStorage(FILENAME, compact_every=compact_every))
+        system.load_data()
+    return system
+
+# Writer `w` owns student w+1 and saves one grade at a time; grade k carries
+# StudyHours=k so readers can tell a lost or reordered grade from a late one
+def writer(workdir, w, grades, compact_every):
+    os.chdir(workdir)
+    from main2 import Student
+    system = open_system(compact_every)
+    id = w + 1
+    system.add_student(Student(id, f'writer {w}'))
+    system.save_data()
+    for k in range(grades):
+        system.add_grade(id, f'Subject {k % 7}', k % 101, 3, float(k))
+        system.save_data()
+
+# Every grade list a reader sees must be 0, 1, 2, ... with nothing missing, and
+# every snapshot line it reads without the lock must be a whole CSV row
+def check(system):
+    problems = []
+    for student in system.students.values():
+        hours = [grade['StudyHours'] for grade in student.grades]
+        if hours != [float(k) for k in range(len(hours))]:
+            problems.append(f'student {student.id}: grades out of order or missing')
+    return problems
+
+def check_raw(filename):
+    try:
+        with open(filename, newline='', encoding='utf-8') as f:
+            text = f.read()
+    except FileNotFoundError:
+        return []
+    if text and not text.endswith('\n'):
+        return ['snapshot read with a torn last line']
+    return [f'torn snapshot row: {line!r}' for line in text.splitlines() if line.count(',') != 5]
+
+def reader(workdir, stop, results):
+    os.chdir(workdir)
+    reads = 0
+    problems = []
+    while not stop.is_set():
+        problems += check_raw(FILENAME)
+        problems += check(open_system(10 ** 9))
+        reads += 1
+    results.put((reads, problems[:10]))
+
+def run(writers, readers, grades, compact_every):
+    with tempfile.TemporaryDirectory() as workdir:
+        stop = multiprocessing.Event()
+        results = multiprocessing.Queue()
+        reader_procs = [multiprocessing.Process(target=reader, args=(workdir, stop, results)) for _ in range(readers)]
+        writer_procs = [multiprocessing.Process(target=writer, args=(workdir, w, grades, compact_every)) for w in range(writers)]
+        for p in reader_procs:
+            p.start()
+        start = time.perf_counter()
+        for p in writer_procs:
+            p.start()
+        for p in writer_procs:
+            p.join()
+        elapsed = time.perf_counter() - start
+        stop.set()
+        reads, problems = 0, []
+        for _ in reader_procs:
+            r, p = results.get()
+            reads += r
+            problems += p
+        for p in reader_procs:
+            p.join()
+
+        os.chdir(workdir)
+        try:
+            final = open_system(compact_every)
+        finally:
+            os.chdir(APP_DIR)
+        problems += check(final)
+        for w in range(writers):
+            student = final.students.get(w + 1)
+            count = len(student.rows) if student else 0
+            if count != grades:
+                problems.append(f'writer {w}: {count} of {grades} grades on disk')
+        if any(p.exitcode for p in writer_procs):
+            problems.append('a writer process failed')
+    return writers * grades / elapsed, reads, problems
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent writer and reader processes on one student_records.csv')
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=2)
+    parser.add_argument('--grades', type=int, default=300, help='grades saved one by one by each writer')
+    parser.add_argument('--compact-every', type=int, default=50, help='small, so snapshots get rewritten under the readers')
+    args = parser.parse_args()
+
+    failed = False
+    for writers in sorted({1, args.writers}):
+        rate, reads, problems = run(writers, args.readers, args.grades, args.compact_every)
+        print(f'{writers} writer(s), {args.readers} reader(s): {rate:,.0f} saved grades/s, {reads} full reads checked')
+        for problem in problems:
+            print(f'  {problem}')
+        failed = failed or bool(problems)
+    if failed:
+        sys.exit('FAIL')
+    print('OK: no lost, reordered or torn records')
+
+if __name__ == '__main__':
+    main()
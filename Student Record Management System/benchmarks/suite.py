@@ -0,0 +1,182 @@
+import io
+import os
+import sys
+import json
+import logging
+import time
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from roster import write_roster
+
+class Main2Variant:
+    name = 'main2'
+
+    def __init__(self):
+        import main2
+        self.module = main2
+
+    def load(self):
+        system = self.module.StudentSystem()
+        system.load_data()
+        return system
+
+    def add_grade(self, system, id, subject, score, credits, study_hours):
+        system.add_grade(id, subject, score, credits, study_hours)
+        system.save_data()
+
+    def view(self, system):
+        with redirect_stdout(io.StringIO()):
+            system.view_records()
+
+    def predictor(self, system):
+        return system.get_predictor()
+
+    def report(self, system):
+        return system.grade_report()
+
+class WebappVariant:
+    name = 'webapp'
+
+    def __init__(self):
+        # Importing webapp runs its UI in Streamlit's bare mode; keep that quiet
+        logging.disable(logging.WARNING)
+        try:
+            import webapp
+        finally:
+            logging.disable(logging.NOTSET)
+        self.module = webapp
+
+    def load(self):
+        return self.module.StudentSystem()
+
+    def add_grade(self, system, id, subject, score, credits, study_hours):
+        system.add_grade(id, subject, score, credits, study_hours)
+
+    # The work the View Records tab does per rerun (first page of 50), minus the Streamlit calls
+    def view(self, system):
+        import pandas as pd
+        visible = system.find_students('')[:50]
+        pd.DataFrame({
+            'ID': [s.id for s in visible],
+            'Name': [s.name for s in visible],
+            'GPA': [round(s.calculate_gpa(), 2) for s in visible],
+            'Courses': [len(s.rows) for s in visible],
+        })
+        if visible:
+            pd.DataFrame(visible[0].grades)[['Subject', 'Score', 'Credits']]
+
+    def predictor(self, system):
+        return system.store.predictor
+
+    # Uncached: the first Subject Analytics render after a change
+    def report(self, system):
+        system.report_cache = (None, None)
+        return system.grade_report()
+
+VARIANTS = {'main2': Main2Variant, 'webapp': WebappVariant}
+
+# Best wall time over `repeat` runs, then one more run under tracemalloc for the peak
+def measure(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': best, 'peak_bytes': peak}
+
+def run_variant(variant, args):
+    rows = write_roster('student_records.csv', args.students, args.subjects, not args.no_study_hours)
+    results = {'rows': rows}
+    results['load_data'] = measure(variant.load, args.repeat)
+
+    system = variant.load()
+    results['calculate_gpa'] = measure(lambda: [student.calculate_gpa() for student in system.students.values()], args.repeat)
+    results['view_records'] = measure(lambda: variant.view(system), args.repeat)
+    results['predict'] = measure(lambda: variant.predictor(system).predict(5.0), args.repeat)
+    results['predict_sklearn_fit'] = measure(
+        lambda: variant.predictor(system).verify(system.store.study_hours, system.store.score), args.repeat)
+    results['grade_report'] = measure(lambda: variant.report(system), args.repeat)
+    # compact() is a no-op with nothing journaled, time the full rewrite it does otherwise
+    results['save_data'] = measure(lambda: system.storage.write_snapshot(system), args.repeat)
+
+    ids = list(system.students)
+    def add_grades():
+        for n in range(args.grades):
+            variant.add_grade(system, ids[n % len(ids)], f'Subject {n % 7}', 75, 3, 4.0)
+    results['add_grade_save'] = measure(add_grades, 1)
+    results['add_grade_save']['grades'] = args.grades
+
+    for filename in ('student_records.csv', 'student_records.csv.journal'):
+        if os.path.exists(filename):
+            os.remove(filename)
+    return results
+
+def print_results(report, previous=None):
+    for variant, results in report['results'].items():
+        print(f"\n{variant} ({results['rows']:,} grade rows)")
+        for case, result in results.items():
+            if case == 'rows':
+                continue
+            line = f"  {case:<22} {result['seconds'] * 1000:>10.2f} ms {result['peak_bytes'] / 1e6:>10.2f} MB"
+            old = (previous or {}).get('results', {}).get(variant, {}).get(case)
+            if old:
+                line += f"   time x{result['seconds'] / max(old['seconds'], 1e-12):.2f}"
+                line += f"  memory x{result['peak_bytes'] / max(old['peak_bytes'], 1):.2f}"
+            print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description='Time and measure the StudentSystem hot paths')
+    parser.add_argument('--students', type=int, default=2000)
+    parser.add_argument('--subjects', type=int, default=10)
+    parser.add_argument('--no-study-hours', action='store_true', help='generate the roster without a StudyHours column')
+    parser.add_argument('--grades', type=int, default=200, help='grades entered one by one in the add_grade + save case')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--variants', nargs='+', choices=sorted(VARIANTS), default=sorted(VARIANTS))
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--compare', help='JSON from an earlier run to compare against')
+    args = parser.parse_args()
+
+    report = {
+        'meta': {
+            'students': args.students,
+            'subjects': args.subjects,
+            'study_hours': not args.no_study_hours,
+            'grades': args.grades,
+            'repeat': args.repeat,
+            'python': platform.python_version(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': {},
+    }
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            previous = json.load(f)
+    output = os.path.abspath(args.output) if args.output else None
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            for name in args.variants:
+                report['results'][name] = run_variant(VARIANTS[name](), args)
+        finally:
+            os.chdir(cwd)
+
+    print_results(report, previous)
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f'\nWrote {output}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+import gc
+import os
+import sys
+import json
+from array import array
+from grade_store import GradeStore, COLUMNS
+from file_lock import atomic_write
+
+# 3: blank study hours are NaN, no longer 0.0 in the columns and the predictor
+VERSION = 3
+
+# The in-memory roster dumped as raw typed arrays next to the CSV
+# (`<csv>.bin`), so a cold start copies buffers instead of parsing text.
+# A JSON header line records the CSV it mirrors (inode, size, mtime); if the CSV
+# has been rewritten or appended to since, the file is ignored and the CSV is
+# parsed as before. The CSV stays the source of truth.
+def binary_filename(filename):
+    return filename + '.bin'
+
+def pack_strings(strings):
+    return '\0'.join(strings).encode('utf-8')
+
+def unpack_strings(data, count):
+    return data.decode('utf-8').split('\0') if count else []
+
+def write_binary(filename, csv_stamp, students, store):
+    ids = array('q')
+    counts = array('i')
+    rows = array('i')
+    total_points = array('d')
+    total_credits = array('d')
+    names = []
+    for student in students:
+        ids.append(student.id)
+        names.append(student.name)
+        counts.append(len(student.rows))
+        rows.extend(student.rows)
+        total_points.append(student.total_points)
+        total_credits.append(student.total_credits)
+    predictor = store.predictor
+    blocks = [('ids', ids), ('counts', counts), ('rows', rows), ('total_points', total_points),
+              ('total_credits', total_credits), ('names', pack_strings(names)),
+              ('subjects', pack_strings(store.subjects))]
+    blocks += [(name, getattr(store, name)) for name, _ in COLUMNS]
+    header = {
+        'version': VERSION,
+        'byteorder': sys.byteorder,
+        'csv': list(csv_stamp),
+        'students': len(ids),
+        'grades': len(store),
+        'subjects': len(store.subjects),
+        'predictor': [predictor.n, predictor.mean_x, predictor.mean_y, predictor.sxx, predictor.sxy],
+        # The GPA totals depend on the grading scale they were summed with
+        'policy': store.policy.key(),
+        'blocks': [[name, getattr(block, 'typecode', ''), memoryview(block).itemsize, memoryview(block).nbytes]
+                   for name, block in blocks],
+    }
+    with atomic_write(binary_filename(filename), binary=True) as f:
+        f.write(json.dumps(header).encode('utf-8') + b'\n')
+        for _, block in blocks:
+            f.write(block)
+
+# Fills an empty `system` from the binary snapshot and returns True, or returns
+# False (touching nothing) when there is no usable one for `csv_stamp`
+def load_binary(filename, csv_stamp, system):
+    path = binary_filename(filename)
+    if csv_stamp is None or not os.path.isfile(path):
+        return False
+    with open(path, 'rb') as f:
+        try:
+            header = json.loads(f.readline())
+        except ValueError:
+            return False
+        if (header.get('version') != VERSION or header['byteorder'] != sys.byteorder
+                or header['csv'] != list(csv_stamp) or header['policy'] != system.store.policy.key()):
+            return False
+        blocks = {}
+        for name, typecode, itemsize, size in header['blocks']:
+            data = f.read(size)
+            if len(data) != size:
+                return False
+            if typecode:
+                if array(typecode).itemsize != itemsize:
+                    return False
+                block = array(typecode)
+                block.frombytes(data)
+                blocks[name] = block
+            else:
+                blocks[name] = data
+
+    store = GradeStore(system.store.policy)
+    for name, _ in COLUMNS:
+        setattr(store, name, blocks[name])
+    store.subjects = unpack_strings(blocks['subjects'], header['subjects'])
+    store.subject_ids = {subject: i for i, subject in enumerate(store.subjects)}
+    predictor = store.predictor
+    predictor.n, predictor.mean_x, predictor.mean_y, predictor.sxx, predictor.sxy = header['predictor']
+
+    system.store = store
+    names = unpack_strings(blocks['names'], header['students'])
+    rows = blocks['rows']
+    start = 0
+    # Nothing built here forms a cycle, so skip the collector passes that a burst
+    # of allocations would otherwise trigger
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for id, name, count, points, credits in zip(blocks['ids'], names, blocks['counts'],
+                                                    blocks['total_points'], blocks['total_credits']):
+            student = system.new_student(id, name)
+            if count:
+                student.rows = rows[start:start + count]
+            student.total_points = points
+            student.total_credits = credits
+            start += count
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return True
@@ -0,0 +1,62 @@
+import csv
+import math
+import time
+
+# Positive integer id, a non-empty name (exported rosters such as "student 12"
+# carry digits, unlike names typed at the CLI menus), score 0-100, credits above
+# zero and non-negative study hours (blank: unknown, NaN).
+def parse_row(id, name, subject, score, credits, study_hours):
+    id = int(id)
+    name = name.lower().strip()
+    if id <= 0 or not name:
+        raise ValueError
+    if not subject:
+        return id, name, None, 0.0, 0.0, 0.0
+
+    score = float(score)
+    credits = float(credits)
+    study_hours = float(study_hours) if study_hours else math.nan
+    if not 0 <= score <= 100 or credits <= 0 or study_hours < 0:
+        raise ValueError
+    return id, name, subject.strip().title(), score, credits, study_hours
+
+# Yields lists of at most `chunk_size` validated rows, plus the rejected count so far
+def read_chunks(filename, chunk_size):
+    with open(filename, 'r', newline='', encoding='utf-8') as csvfile:
+        reader = csv.reader(csvfile)
+        header = next(reader, [])
+        columns = [header.index(name) if name in header else None
+                   for name in ['ID', 'Name', 'Subject', 'Score', 'Credits', 'StudyHours']]
+        if None in columns[:5]:
+            raise ValueError(f'{filename} needs ID, Name, Subject, Score and Credits columns')
+
+        chunk = []
+        rejected = 0
+        for row in reader:
+            try:
+                chunk.append(parse_row(*(row[i] if i is not None else '' for i in columns)))
+            except (ValueError, IndexError):
+                rejected += 1
+                continue
+            if len(chunk) == chunk_size:
+                yield chunk, rejected
+                chunk = []
+        yield chunk, rejected
+
+# Streams `filename` into `system` one chunk at a time and persists once at the
+# end. Other processes wait for the import: the rows are only in memory until then.
+def import_csv(system, filename, chunk_size=50000, report=print):
+    start = time.perf_counter()
+    imported = 0
+    rejected = 0
+    with system.storage.exclusive(system):
+        for chunk, rejected in read_chunks(filename, chunk_size):
+            system.merge_rows(chunk)
+            imported += len(chunk)
+            rate = (imported + rejected) / max(time.perf_counter() - start, 1e-9)
+            report(f'{imported:,} rows imported, {rejected:,} rejected ({rate:,.0f} rows/s)')
+
+        system.compact()
+    elapsed = time.perf_counter() - start
+    report(f'Done: {imported:,} rows in {elapsed:.1f}s ({imported / max(elapsed, 1e-9):,.0f} rows/s)')
+    return imported, rejected
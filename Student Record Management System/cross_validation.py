@@ -0,0 +1,75 @@
+import os
+from predictor import ScorePredictor, CohortModel
+
+MODELS = ['Study hours', 'Study hours, credits and subject']
+
+# Below this many grades the folds run in this process: starting workers costs more
+MIN_PARALLEL_ROWS = 200000
+
+# The columns and fold numbers every fold reads, set once per worker process
+fold_columns = None
+
+def share_columns(columns):
+    global fold_columns
+    fold_columns = columns
+
+# (RMSE, MAE, R squared) of `predicted` against `actual`
+def evaluate(actual, predicted):
+    import numpy as np
+    error = predicted - actual
+    spread = float(((actual - actual.mean()) ** 2).sum())
+    r2 = 1 - float((error ** 2).sum()) / spread if spread else 0.0
+    return float(np.sqrt((error ** 2).mean())), float(np.abs(error).mean()), r2
+
+# Fits both models without fold `fold` and scores them on it
+def run_fold(fold):
+    import numpy as np
+    subject, subjects, score, credits, study_hours, assignment = fold_columns
+    test = assignment == fold
+    train = ~test
+    hours, scores = study_hours[train], score[train]
+    baseline = ScorePredictor.from_sums(len(scores), hours.sum(), scores.sum(), hours @ hours, hours @ scores)
+    cohort = CohortModel.fit(subject[train], subjects, scores, credits[train], hours)
+    predictions = [np.clip(baseline.predict(study_hours[test]), 0, 100),
+                   cohort.predict(study_hours[test], credits[test], subject[test], subjects)]
+    return [[model, fold + 1, *evaluate(score[test], predicted)] for model, predicted in zip(MODELS, predictions)]
+
+# k-fold cross-validation of the study-hours regression and of CohortModel over
+# the given columns (as CohortModel.fit takes them). Grades are dealt into folds
+# by a seeded shuffle, so the same data always gives the same report. Large data
+# sets run the folds on a pool of `workers` processes (all cores by default),
+# each receiving the columns once. Grades without study hours (NaN) are left out.
+# Returns None with too few grades for `folds`.
+def cross_validate(subject, subjects, score, credits, study_hours, folds=5, workers=None, seed=0):
+    import numpy as np
+    study_hours = np.asarray(study_hours, dtype=np.float64)
+    known = ~np.isnan(study_hours)
+    n = int(known.sum())
+    if folds < 2 or n < folds * CohortModel.MIN_RECORDS:
+        return None
+    columns = (np.asarray(subject, dtype=np.intp)[known], list(subjects), np.asarray(score, dtype=np.float64)[known],
+               np.asarray(credits, dtype=np.float64)[known], study_hours[known],
+               np.random.default_rng(seed).permutation(n) % folds)
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and n >= MIN_PARALLEL_ROWS:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        # Spawned, as in parallel_csv.py
+        with ProcessPoolExecutor(min(workers, folds), mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=share_columns, initargs=(columns,)) as pool:
+            results = list(pool.map(run_fold, range(folds)))
+    else:
+        share_columns(columns)
+        try:
+            results = [run_fold(fold) for fold in range(folds)]
+        finally:
+            share_columns(None)
+    return {'folds': folds, 'grades': n, 'results': [row for result in results for row in result]}
+
+# [(model, mean RMSE, mean MAE, mean R squared)] over the folds of a report
+def summarize(report):
+    summary = []
+    for model in MODELS:
+        rows = [row for row in report['results'] if row[0] == model]
+        summary.append((model, *(sum(row[i] for row in rows) / len(rows) for i in (2, 3, 4))))
+    return summary
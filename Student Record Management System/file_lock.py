@@ -0,0 +1,63 @@
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # No fcntl on Windows: only threads of the same process are coordinated there
+    fcntl = None
+
+# Advisory lock shared by every process working on the same records file. It is
+# taken on a sidecar `<file>.lock` so the data files themselves can be replaced.
+# Re-entrant within a process: nested hold() calls ride on the outermost one,
+# whose mode (shared or exclusive) applies, so never nest exclusive inside shared.
+class FileLock:
+    def __init__(self, path):
+        self.path = path + '.lock'
+        self.thread_lock = threading.RLock()
+        self.depth = 0
+        self.file = None
+
+    @contextmanager
+    def hold(self, exclusive=True):
+        with self.thread_lock:
+            if self.depth == 0:
+                self.file = open(self.path, 'a')
+                if fcntl:
+                    fcntl.flock(self.file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self.depth += 1
+            try:
+                yield
+            finally:
+                self.depth -= 1
+                if self.depth == 0:
+                    # Closing the descriptor releases the flock
+                    self.file.close()
+                    self.file = None
+
+# flock() locks belong to an open file, so one process must use a single FileLock per path
+_locks = {}
+_locks_guard = threading.Lock()
+
+def lock_for(path):
+    path = os.path.abspath(path)
+    with _locks_guard:
+        if path not in _locks:
+            _locks[path] = FileLock(path)
+        return _locks[path]
+
+# Readers see either the old file or the new one, never a half-written file
+@contextmanager
+def atomic_write(path, binary=False):
+    tmp = f'{path}.{os.getpid()}.tmp'
+    try:
+        with (open(tmp, mode='wb') if binary else open(tmp, mode='w', newline='', encoding='utf-8')) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
@@ -0,0 +1,92 @@
+from array import array
+from predictor import ScorePredictor
+from grading import DEFAULT_POLICY
+
+COLUMNS = [('student', 'i'), ('subject', 'i'), ('score', 'd'), ('credits', 'd'), ('study_hours', 'd')]
+
+# Every grade in the system, stored column by column in typed arrays (about 32
+# bytes a row) with each subject name kept once in `subjects`. A Student only
+# holds the row numbers of its own grades. Study hours are NaN where none were
+# entered. `policy` is the grading scale every GPA over these grades uses (see grading.py).
+class GradeStore:
+    def __init__(self, policy=None):
+        self.policy = policy if policy is not None else DEFAULT_POLICY
+        for name, typecode in COLUMNS:
+            setattr(self, name, array(typecode))
+        self.subjects = []
+        self.subject_ids = {}
+        self.predictor = ScorePredictor()
+
+    def __len__(self):
+        return len(self.score)
+
+    def intern(self, subject):
+        subject_id = self.subject_ids.get(subject)
+        if subject_id is None:
+            subject_id = self.subject_ids[subject] = len(self.subjects)
+            self.subjects.append(subject)
+        return subject_id
+
+    def append(self, student, subject, score, credits, study_hours):
+        row = len(self.score)
+        values = (student, self.intern(subject), score, credits, study_hours)
+        try:
+            for (name, _), value in zip(COLUMNS, values):
+                getattr(self, name).append(value)
+        except BufferError:
+            # A view from columns() still pins the old buffers; leave them to it and carry on with copies
+            for name, typecode in COLUMNS:
+                setattr(self, name, array(typecode, getattr(self, name)[:row]))
+            for (name, _), value in zip(COLUMNS, values):
+                getattr(self, name).append(value)
+        self.predictor.add(study_hours, score)
+        return row
+
+    # Appends whole columns of rows at once (subject ids already interned), with
+    # `predictor` holding the statistics of those rows
+    def extend(self, student, subject, score, credits, study_hours, predictor):
+        row = len(self.score)
+        values = (student, subject, score, credits, study_hours)
+        try:
+            for (name, _), value in zip(COLUMNS, values):
+                getattr(self, name).extend(value)
+        except BufferError:
+            for name, typecode in COLUMNS:
+                setattr(self, name, array(typecode, getattr(self, name)[:row]))
+            for (name, _), value in zip(COLUMNS, values):
+                getattr(self, name).extend(value)
+        self.predictor.merge(predictor)
+
+    def get(self, row):
+        return self.subjects[self.subject[row]], self.score[row], self.credits[row], self.study_hours[row]
+
+    # StudyHours is None for a grade entered without them (NaN in the column)
+    def row(self, row):
+        subject, score, credits, study_hours = self.get(row)
+        return {'Subject': subject, 'Score': score, 'Credits': credits,
+                'StudyHours': None if study_hours != study_hours else study_hours}
+
+    # Zero-copy, read-only NumPy views over the columns. A view pins the buffer it
+    # was taken from, so it stays valid (if stale) after later appends.
+    def columns(self):
+        import numpy as np
+        views = {}
+        for name, typecode in COLUMNS:
+            view = np.frombuffer(getattr(self, name), dtype=np.int32 if typecode == 'i' else np.float64)
+            view.flags.writeable = False
+            views[name] = view
+        return views
+
+    # Credit-weighted GPA of students 0..count-1 in one pass over the columns
+    def gpas(self, count):
+        columns = self.columns()
+        return column_gpas(columns['student'], columns['score'], columns['credits'], count, self.policy)
+
+# Credit-weighted GPA of students 0..count-1, given each grade's student number
+def column_gpas(student, score, credits, count, policy):
+    import numpy as np
+    student, score, credits = np.asarray(student, dtype=np.intp), np.asarray(score), np.asarray(credits)
+    points = policy.points_array(score)
+    total_points = np.bincount(student, weights=points * credits, minlength=count)
+    total_credits = np.bincount(student, weights=credits, minlength=count)
+    return np.divide(total_points, total_credits, out=np.zeros(count), where=total_credits != 0)
@@ -0,0 +1,92 @@
+import os
+import json
+from bisect import bisect_right
+
+POLICY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'grading_policies.json')
+
+# A grading scale as steps of (lowest score, letter, grade points). Lookup tables
+# over 0-100 are built once, at the finest resolution the bounds need (1, 0.1,
+# 0.01 or 0.001 points), so mapping any score - fractional ones included - is a
+# single index instead of a chain of comparisons. Scores outside 0-100 are
+# clamped to it.
+class GradingPolicy:
+    def __init__(self, name, steps):
+        steps = sorted((float(low), str(letter), float(points)) for low, letter, points in steps)
+        if not steps or steps[0][0] != 0:
+            raise ValueError(f'{name}: the lowest step must start at 0')
+        if len({low for low, _, _ in steps}) != len(steps) or steps[-1][0] > 100:
+            raise ValueError(f'{name}: step bounds must be distinct and within 0-100')
+        self.name = name
+        self.bounds = [low for low, _, _ in steps]
+        self.letters = [letter for _, letter, _ in steps]
+        self.grade_points = [points for _, _, points in steps]
+
+        for resolution in (1, 10, 100, 1000):
+            if all(abs(bound * resolution - round(bound * resolution)) < 1e-9 for bound in self.bounds):
+                break
+        else:
+            raise ValueError(f'{name}: step bounds need more than three decimals')
+        self.resolution = resolution
+        self.step_table = [bisect_right(self.bounds, cell / resolution) - 1 for cell in range(100 * resolution + 1)]
+        self.point_table = [self.grade_points[step] for step in self.step_table]
+        self.letter_table = [self.letters[step] for step in self.step_table]
+
+    def cell(self, score):
+        if score <= 0:
+            return 0
+        if score >= 100:
+            return 100 * self.resolution
+        # The small nudge keeps 89.3 * 10 = 892.9999... in the 89.3 cell
+        return int(score * self.resolution + 1e-9)
+
+    def step(self, score):
+        return self.step_table[self.cell(score)]
+
+    def points(self, score):
+        return self.point_table[self.cell(score)]
+
+    def letter(self, score):
+        return self.letter_table[self.cell(score)]
+
+    # Vectorized versions over a NumPy array (or anything np.asarray takes)
+    def cells(self, scores):
+        import numpy as np
+        return (np.clip(np.asarray(scores, dtype=np.float64), 0, 100) * self.resolution + 1e-9).astype(np.intp)
+
+    def step_array(self, scores):
+        import numpy as np
+        return np.asarray(self.step_table, dtype=np.intp)[self.cells(scores)]
+
+    def points_array(self, scores):
+        import numpy as np
+        return np.asarray(self.point_table)[self.cells(scores)]
+
+    def letter_array(self, scores):
+        import numpy as np
+        return np.asarray(self.letter_table)[self.cells(scores)]
+
+    # Identifies the scale in files written with it, as JSON would read it back (see binary_snapshot.py)
+    def key(self):
+        return [self.name, [[low, letter, points] for low, letter, points in zip(self.bounds, self.letters, self.grade_points)]]
+
+DEFAULT_POLICY = GradingPolicy('Standard 4.0', [
+    (93, 'A', 4.0), (90, 'A-', 3.7), (87, 'B+', 3.3), (83, 'B', 3.0), (80, 'B-', 2.7), (77, 'C+', 2.3),
+    (73, 'C', 2.0), (70, 'C-', 1.7), (67, 'D+', 1.3), (60, 'D', 1.0), (0, 'F', 0.0),
+])
+
+# {name: GradingPolicy} from a JSON file of {"scales": {name: [[lowest score, letter, points], ...]}},
+# in file order; the built-in standard scale is used when the file does not exist
+def load_policies(path=POLICY_FILE):
+    if not os.path.isfile(path):
+        return {DEFAULT_POLICY.name: DEFAULT_POLICY}
+    with open(path, encoding='utf-8') as f:
+        scales = json.load(f)['scales']
+    return {name: GradingPolicy(name, steps) for name, steps in scales.items()}
+
+def get_policy(name=None, path=POLICY_FILE):
+    if name is None:
+        return DEFAULT_POLICY
+    policies = load_policies(path)
+    if name not in policies:
+        raise ValueError(f'Unknown grading scale {name!r}; choose from {", ".join(policies)}')
+    return policies[name]
@@ -0,0 +1,136 @@
+import os
+import io
+import csv
+import math
+import time
+
+def file_stamp(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+# True when `new` is the same file as `old` with only bytes appended past `offset`
+def appended(old, new, offset):
+    if new is None:
+        return old is None
+    if old is None:
+        return offset == 0
+    return new[0] == old[0] and new[1] >= offset
+
+# Complete lines written after `offset`, and the offset just past the last of them
+def read_new_lines(path, offset):
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        data = f.read()
+    end = data.rfind(b'\n') + 1
+    return data[:end].decode('utf-8'), offset + end
+
+# Append-only log of mutations made since the last full snapshot of the CSV.
+# The first row stamps the snapshot (size:mtime) the log applies on top of, so a
+# log left behind by an interrupted compaction, or by a program that rewrote the
+# CSV without replaying it, is recognised as stale and moved aside. Records
+# are buffered until flush(), which writes and fsyncs them as one batch; callers
+# sharing the files with other processes flush under the exclusive file lock.
+class Journal:
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.filename = snapshot + '.journal'
+        self.pending = []
+        self.records = 0
+        self.offset = 0
+
+    def snapshot_stamp(self):
+        if not os.path.isfile(self.snapshot):
+            return 'none'
+        st = os.stat(self.snapshot)
+        return f'{st.st_size}:{st.st_mtime_ns}'
+
+    def log_student(self, id, name):
+        self.append(['S', id, name])
+
+    # Missing study hours (NaN) are logged as a blank field
+    def log_grade(self, id, subject, score, credits, study_hours):
+        self.append(['G', id, subject, score, credits, '' if math.isnan(study_hours) else study_hours])
+
+    def append(self, record):
+        self.pending.append(record)
+
+    def flush(self):
+        if not self.pending:
+            return
+        new_file = not os.path.isfile(self.filename)
+        with open(self.filename, mode='a', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow(['#', self.snapshot_stamp()])
+            elif not self.ends_with_newline():
+                # Finish a line torn by a crash so the first new record stays readable
+                f.write('\r\n')
+            writer.writerows(self.pending)
+            f.flush()
+            os.fsync(f.fileno())
+            self.offset = os.fstat(f.fileno()).st_size
+        self.records += len(self.pending)
+        self.pending = []
+
+    def ends_with_newline(self):
+        with open(self.filename, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return True
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def replay(self, offset=0):
+        if not os.path.isfile(self.filename):
+            if offset == 0:
+                self.records = 0
+                self.offset = 0
+            return
+
+        # A crash in the middle of an append can leave a torn last line, which is left unread
+        data, end = read_new_lines(self.filename, offset)
+        rows = list(csv.reader(io.StringIO(data)))
+        if offset == 0:
+            if not rows or rows[0] != ['#', self.snapshot_stamp()]:
+                self.set_aside()
+                return
+            rows = rows[1:]
+            self.records = 0
+
+        self.offset = end
+        self.records += len(rows)
+        for row in rows:
+            try:
+                if row[0] == 'S':
+                    yield 'S', int(row[1]), row[2]
+                elif row[0] == 'G':
+                    yield 'G', int(row[1]), row[2], float(row[3]), float(row[4]), float(row[5]) if row[5] else math.nan
+            except (ValueError, IndexError):
+                continue
+
+    # Keeps a stale log as `<journal>.stale-<time>` instead of deleting it: its
+    # records are already in the CSV after an interrupted compaction, but are lost
+    # if some other program rewrote the CSV without them
+    def set_aside(self):
+        stale = f"{self.filename}.stale-{time.strftime('%Y%m%d-%H%M%S')}"
+        try:
+            os.replace(self.filename, stale)
+            print(f'Warning: {self.filename} does not match {self.snapshot}; moved it to {stale}. '
+                  'Check it for records missing from the CSV.')
+        except FileNotFoundError:
+            pass
+        self.pending = []
+        self.records = 0
+        self.offset = 0
+
+    def clear(self):
+        self.pending = []
+        self.records = 0
+        self.offset = 0
+        try:
+            os.remove(self.filename)
+        except FileNotFoundError:
+            pass
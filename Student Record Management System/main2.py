@@ -1,88 +1,215 @@
 import os
-import csv
-import pandas as pd
-from sklearn.linear_model import LinearRegression
-import numpy as np
+import math
+import argparse
+from array import array
+from contextlib import contextmanager
+from storage import CsvStorage, SqliteStorage
+from bulk_import import import_csv
+from analytics import subject_report, letter_report
+from ranking import GpaRanking
+from name_index import NameIndex
+from batch import Batch
+from grade_store import GradeStore, column_gpas
+from model_artifact import ModelArtifact, model_filename
+from cross_validation import summarize
+from grading import get_policy, POLICY_FILE
 
 def clear_screen():
     os.system('cls' if os.name == 'nt' else 'clear')
 
+# Grades live in the shared GradeStore; a Student is just its row numbers and
+# GPA totals, with __slots__ instead of a per-instance __dict__. `rows` starts as
+# the shared empty tuple and becomes an array with the first grade, so a student
+# without grades costs no row buffer.
 class Student:
-    def __init__(self, id, name):
+    __slots__ = ('id', 'name', 'store', 'index', 'rows', 'total_points', 'total_credits')
+
+    def __init__(self, id, name, store=None, index=0):
         self.id = id
         self.name = name
-        self.grades = []
+        self.store = store if store is not None else GradeStore()
+        self.index = index
+        self.rows = ()
+        self.total_points = 0
+        self.total_credits = 0
 
     def __str__(self):
         return f'Student ID: {self.id}\nStudent name: {self.name}'
 
+    @property
+    def grades(self):
+        return [self.store.row(row) for row in self.rows]
+
     def add_grade(self, subject, score, credits, study_hours):
-            self.grades.append({
-                'Subject' : subject,
-                'Score' : score,
-                'Credits' : credits,
-                'StudyHours': study_hours
-            })
+            row = self.store.append(self.index, subject, score, credits, study_hours)
+            if not self.rows:
+                self.rows = array('i')
+            self.rows.append(row)
+            # Keep GPA totals current so calculate_gpa never rescans the grades
+            self.total_points += self.get_grade_points(self.store.score[row]) * self.store.credits[row]
+            self.total_credits += self.store.credits[row]
+
+    # Move this student's grades into the system-wide store, re-totalling them
+    # under its grading scale
+    def attach(self, store, index):
+        grades = [self.store.get(row) for row in self.rows]
+        self.store, self.index, self.rows = store, index, ()
+        self.total_points = 0
+        self.total_credits = 0
+        for grade in grades:
+            self.add_grade(*grade)
     
     def calculate_gpa(self):
-        total_points = 0
-        total_credits = 0
-
-        for grade in self.grades:
-            grade_point = self.get_grade_points(grade['Score'])
-            total_points += grade_point * grade['Credits']
-            total_credits += grade['Credits']
-
-        if total_credits == 0:
+        if self.total_credits == 0:
             return 0.0
         else:
-            gpa = total_points / total_credits
+            gpa = self.total_points / self.total_credits
             return gpa
 
     def get_grade_points(self, score):
-        if score >= 93: return 4.0
-        elif score >= 90: return 3.7
-        elif score >= 87: return 3.3
-        elif score >= 83: return 3.0
-        elif score >= 80: return 2.7
-        elif score >= 77: return 2.3
-        elif score >= 73: return 2.0
-        elif score >= 70: return 1.7
-        elif score >= 67: return 1.3
-        elif score >= 60: return 1.0
-        else: return 0.0
+        return self.store.policy.points(score)
 
     def get_letter_grade(self, score):
-        if score >= 93: return 'A'
-        elif score >= 90: return 'A-'
-        elif score >= 87: return 'B+'
-        elif score >= 83: return 'B'
-        elif score >= 80: return 'B-'
-        elif score >= 77: return 'C+'
-        elif score >= 73: return 'C'
-        elif score >= 70: return 'C-'
-        elif score >= 67: return 'D+'
-        elif score >= 60: return 'D'
-        else: return 'F'
+        return self.store.policy.letter(score)
 
 class StudentSystem:
-    def __init__(self):
+    def __init__(self, storage=None, policy=None):
         self.students = {}
-        self.filename = 'student_records.csv'
+        self.storage = storage if storage is not None else CsvStorage()
+        self.filename = self.storage.filename
+        self.store = GradeStore(policy)
+        self.policy = self.store.policy
+        self.ranking = None
+        self.cohort = None
+        self.artifact = ModelArtifact(model_filename(self.filename))
+        self.names = NameIndex()
+
+    def new_student(self, id, name):
+        self.students[id] = Student(id, name, self.store, len(self.students))
+        return self.students[id]
 
     def add_student(self, student):
-        if student.id in self.students:
+        if self.search_by_id(student.id):
             print(f'Error: Student with Id {student.id} already exists')
             return False
         else:
+            ranked = self.ranking_current()
+            student.attach(self.store, len(self.students))
             self.students[student.id] = student
+            if ranked:
+                self.ranking.update(student)
+            if self.names.students is self.students:
+                self.names.refresh(self.students)
+            self.storage.add_student(student.id, student.name)
+            for row in student.rows:
+                self.storage.add_grade(student.id, *self.store.get(row))
             return True
 
     def add_grade(self, id, subject, score, credits, study_hours):
         if not self.search_by_id(id):
             return
         else:
-            self.search_by_id(id).add_grade(subject, score, credits, study_hours)
+            ranked = self.ranking_current()
+            student = self.search_by_id(id)
+            student.add_grade(subject, score, credits, study_hours)
+            if ranked:
+                self.ranking.update(student)
+            self.storage.add_grade(id, subject, score, credits, study_hours)
+
+    # Bulk path for validated (id, name, subject, score, credits, study_hours) rows.
+    # Nothing is journaled row by row: call it inside storage.exclusive() and
+    # compact() once afterwards, before leaving it, to persist.
+    def merge_rows(self, rows):
+        self.storage.merge_rows(rows)
+        for id, name, subject, score, credits, study_hours in rows:
+            student = self.students.get(id)
+            if student is None:
+                if self.storage.lazy:
+                    continue
+                student = self.new_student(id, name)
+            if subject is not None:
+                student.add_grade(subject, score, credits, study_hours)
+
+    def ranking_current(self):
+        return self.ranking is not None and self.ranking.current(self.store)
+
+    # GPA ranking of every student (see ranking.py). Built on first use and kept up
+    # to date by add_student/add_grade; rebuilt if grades arrived any other way.
+    # A lazy storage has no full roster in memory, so it is built afresh each time.
+    def get_ranking(self):
+        if self.storage.lazy:
+            return GpaRanking(self.iter_students(), self.store)
+        if not self.ranking_current():
+            self.ranking = GpaRanking(self.students.values(), self.store)
+        return self.ranking
+
+    def view_ranking(self, count):
+        ranking = self.get_ranking()
+        print(f"\n--- Top {count} of {len(ranking)} ranked students ---")
+        for id, gpa in ranking.top(count):
+            print(f"{ranking.rank(id):>4}. {self.search_by_id(id).name} (ID {id}): GPA {gpa:.2f}")
+
+    # Score-on-StudyHours regression over every grade, kept up to date by add_grade
+    def get_predictor(self):
+        if self.storage.lazy:
+            return self.storage.predictor()
+        return self.store.predictor
+
+    # (subject_ids, subjects, scores, credits, study_hours) of every grade; a lazy
+    # storage reads them from the whole database
+    def model_columns(self):
+        if self.storage.lazy:
+            return self.storage.grade_columns(study_hours=True)
+        columns = self.store.columns()
+        return columns['subject'], self.store.subjects, columns['score'], columns['credits'], columns['study_hours']
+
+    # Score on StudyHours, Credits and Subject (see predictor.CohortModel). The
+    # fit is saved with a fingerprint of the grades (see model_artifact.py) and
+    # only redone once they change.
+    def get_cohort_model(self):
+        if self.storage.lazy:
+            return self.artifact.model_for(*self.model_columns())
+        if self.cohort is None or self.cohort[0] is not self.store or self.cohort[1] != len(self.store):
+            self.cohort = (self.store, len(self.store), self.artifact.model_for(*self.model_columns()))
+        return self.cohort[2]
+
+    # k-fold cross-validation of both predictors, saved along with the model
+    def cross_validation(self, folds=5):
+        return self.artifact.report_for(*self.model_columns(), folds)
+
+    # Projected next-term GPAs, one row per student in the order of self.students
+    # and one column per entry of `planned_hours` (see CohortModel.project_gpas).
+    # With a lazy storage self.students is only who was looked up: see gpa_projection.
+    def project_gpas(self, planned_hours):
+        columns = self.store.columns()
+        return self.get_cohort_model().project_gpas(columns['student'], columns['subject'], self.store.subjects, columns['credits'],
+                                                    len(self.students), planned_hours, self.policy)
+
+    # (current GPAs, projected next-term GPAs x `planned_hours`) of every student
+    # with grades, each retaking their subjects. A lazy storage reads every grade
+    # from the database, so the whole roster is covered either way.
+    def gpa_projection(self, planned_hours):
+        import numpy as np
+        if self.storage.lazy:
+            student, count, subject, subjects, score, credits = self.storage.student_columns()
+        else:
+            columns = self.store.columns()
+            student, count, subject, subjects, score, credits = (columns['student'], len(self.students), columns['subject'],
+                                                                 self.store.subjects, columns['score'], columns['credits'])
+        projected = self.get_cohort_model().project_gpas(student, subject, subjects, credits, count, planned_hours, self.policy)
+        current = column_gpas(student, score, credits, count, self.policy)
+        graded = np.bincount(np.asarray(student, dtype=np.intp), weights=credits, minlength=count) > 0
+        return current[graded], projected[graded]
+
+    # Per-subject and per-letter-grade aggregates over every grade (see analytics.py)
+    def grade_report(self):
+        if self.storage.lazy:
+            subject_ids, subjects, scores, credits = self.storage.grade_columns()
+        else:
+            columns = self.store.columns()
+            subject_ids, subjects, scores, credits = columns['subject'], self.store.subjects, columns['score'], columns['credits']
+        return (subject_report(subject_ids, subjects, scores, credits, self.policy),
+                letter_report(scores, credits, self.policy))
 
     def get_student_info(self):
         while True:
@@ -105,75 +232,115 @@ class StudentSystem:
         
         return student_id, student_name
     
+    # GPAs of every student recomputed from the grades in one vectorized pass, in
+    # the order of self.students (with a lazy storage, only the students looked up
+    # so far). Reading calculate_gpa's running totals is cheaper; this re-derives
+    # them, and benchmarks/bench_gpa.py checks that both agree.
+    def compute_all_gpas(self):
+        return self.store.gpas(len(self.students))
+
     def search_by_id(self, id):
-        if id not in self.students.keys():
-            return None
-        else:
+        if id in self.students:
             return self.students[id]
+        if not self.storage.lazy:
+            return None
+        found = self.storage.find_student(id)
+        if found is None:
+            return None
+        name, grades = found
+        student = self.new_student(id, name)
+        for grade in grades:
+            student.add_grade(*grade)
+        return student
+
+    # Every student; a lazy storage streams them without caching
+    def iter_students(self):
+        if not self.storage.lazy:
+            yield from self.students.values()
+            return
+        for id, name, grades in self.storage.iter_students():
+            student = self.students.get(id)
+            if student is None:
+                student = Student(id, name, GradeStore(self.policy))
+                for grade in grades:
+                    student.add_grade(*grade)
+            yield student
+
+    # [(id, name)] of up to `limit` students matching `query` by name prefix or,
+    # failing that, approximately (see name_index.py). A lazy storage only does prefixes.
+    def find_by_name(self, query, limit=10):
+        if self.storage.lazy:
+            return self.storage.find_names(' '.join(query.split()), limit)
+        self.names.refresh(self.students)
+        return [(id, self.students[id].name) for id in self.names.search(query, limit)]
+
+    # Students whose ID equals `query` or whose name contains it (everyone for an
+    # empty query), as the web apps list them
+    def find_students(self, query):
+        query = query.strip().lower()
+        if query.isdigit():
+            student = self.search_by_id(int(query))
+            return [student] if student else []
+        return [student for student in self.iter_students() if query in student.name.lower()]
 
     def get_id(self):
         while True:
-            try:
-                id = int(input('Enter your id\n-> '))
-                if id <= 0 :
-                    raise ValueError
+            answer = input('Enter your id (or a name to search)\n-> ').strip()
+            if answer.isdigit() and int(answer) > 0:
+                id = int(answer)
                 break
-            except ValueError:
+            matches = self.find_by_name(answer) if answer else []
+            if not matches:
                 print('please enter an integer')
+            for match_id, name in matches:
+                print(f'  {match_id} - {name}')
         
-        if not id in self.students:
+        if not self.search_by_id(id):
             return None
         return id
 
+    # Buffers add_student/add_grade calls (see batch.py) and applies them with one
+    # save when the block ends; an exception inside the block discards them all
+    @contextmanager
+    def batch(self):
+        batch = Batch(lambda id: self.search_by_id(id) is not None)
+        yield batch
+        self.apply_batch(batch.records)
+
+    def apply_batch(self, records):
+        for record in records:
+            if record[0] == 'S':
+                self.add_student(Student(record[1], record[2]))
+            else:
+                self.add_grade(*record[1:])
+        self.save_data()
+
     def save_data(self):
-        with open(self.filename, mode='w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['ID', 'Name', 'Subject', 'Score', 'Credits', 'StudyHours']
-            writer = csv.writer(csvfile)
-            writer.writerow(fieldnames)
-
-            for student in self.students.values():
-                if not student.grades:
-                     writer.writerow([student.id, student.name, '', '', '', ''])
-                else:
-                    for grade in student.grades:
-                        student_data = [
-                            student.id, 
-                            student.name, 
-                            grade['Subject'], 
-                            grade['Score'], 
-                            grade['Credits'],
-                            grade.get('StudyHours', 0)
-                        ]
-                        writer.writerow(student_data)
+        self.storage.commit(self)
+
+    def compact(self):
+        self.storage.compact(self)
     
     def load_data(self):
-        abs_path = os.path.abspath(self.filename)
-        if not os.path.isfile(abs_path):
-            print('File not found. Starting fresh.')
-        else:
-            with open(abs_path,'r' ,newline='') as csvfile:
-                reader = csv.DictReader(csvfile)
-                for row in reader:
-                    try:
-                        id = int(row['ID'])
-                        name = row['Name']
-                        
-                        if id not in self.students:
-                            self.students[id] = Student(id, name)
-                        
-                        if row['Subject']:
-                            subject = row['Subject']
-                            score = float(row['Score'])
-                            credits = float(row['Credits'])
-                            study_hours = float(row['StudyHours']) if 'StudyHours' in row and row['StudyHours'] else 0.0
-                            
-                            self.students[id].add_grade(subject, score, credits, study_hours)
-                    except ValueError:
-                        continue
+        self.storage.load(self)
+
+    def reload(self):
+        self.students = {}
+        self.store = GradeStore(self.policy)
+        self.load_data()
+
+    # Catches up with what other processes saved since; only stat() calls when
+    # nothing changed. A lazy storage reads the database on every lookup anyway.
+    def refresh(self):
+        if self.storage.lazy or not self.storage.changed():
+            return False
+        with self.storage.lock.hold(exclusive=False):
+            self.storage.sync(self)
+        return True
     
     def view_records(self):
         print("\n--- Student Records ---")
-        for student in self.students.values():
+        for student in self.iter_students():
             print(student)
             gpa = student.calculate_gpa()
             print(f"Overall GPA: {gpa:.2f}")
@@ -183,46 +350,97 @@ class StudentSystem:
             else:
                 for student_grade in student.grades:
                     letter = student.get_letter_grade(student_grade['Score'])
-                    print(f"  - {student_grade['Subject']}: {student_grade['Score']} ({letter}) | Study Hours: {student_grade['StudyHours']}")
+                    hours = student_grade['StudyHours']
+                    print(f"  - {student_grade['Subject']}: {student_grade['Score']} ({letter}) | Study Hours: {'-' if hours is None else hours}")
             print('-'*20)
 
-    def predict_score(self):
-        print("\n--- AI Score Predictor ---")
-        try:
-            df = pd.read_csv(self.filename)
-        except FileNotFoundError:
-            print("No data found.")
+    def view_report(self):
+        subjects, letters = self.grade_report()
+        if not len(letters['Letter']):
+            print('No grades recorded.')
             return
+        print("\n--- Subject Report ---")
+        print(f"{'Subject':<20}{'Count':>8}{'Mean':>8}{'Std':>8}{'P25':>8}{'Median':>8}{'P75':>8}{'Pass':>8}{'Credits':>9}  Letters")
+        for i, subject in enumerate(subjects['Subject']):
+            histogram = ' '.join(f'{letter}:{subjects[letter][i]}' for letter in letters['Letter'] if subjects[letter][i])
+            print(f"{subject[:19]:<20}{subjects['Count'][i]:>8}{subjects['Mean'][i]:>8.1f}{subjects['Std'][i]:>8.1f}"
+                  f"{subjects['P25'][i]:>8.1f}{subjects['Median'][i]:>8.1f}{subjects['P75'][i]:>8.1f}"
+                  f"{subjects['Pass rate'][i]:>8.0%}{subjects['Credits'][i]:>9.0f}  {histogram}")
+        print("\n--- Letter Grades ---")
+        print(f"{'Letter':<8}{'Count':>8}{'Mean':>8}{'Std':>8}{'P25':>8}{'Median':>8}{'P75':>8}{'Credits':>9}")
+        for i, letter in enumerate(letters['Letter']):
+            print(f"{letter:<8}{letters['Count'][i]:>8}{letters['Mean'][i]:>8.1f}{letters['Std'][i]:>8.1f}"
+                  f"{letters['P25'][i]:>8.1f}{letters['Median'][i]:>8.1f}{letters['P75'][i]:>8.1f}{letters['Credits'][i]:>9.0f}")
 
-        if 'StudyHours' not in df.columns:
-            print("Error: Your data file is old. Please add new grades with 'Study Hours' first.")
-            return
-        
-        df = df.dropna(subset=['Score', 'StudyHours'])
+    def predict_score(self):
+        print("\n--- AI Score Predictor ---")
+        predictor = self.get_predictor()
         
-        if len(df) < 5:
-            print(f"Not enough data to train AI. You have {len(df)} records, but need at least 5.")
+        if not predictor.ready():
+            print(f"Not enough data to train AI. You have {predictor.n} records, but need at least {predictor.MIN_RECORDS}.")
             return
 
-        X = df[['StudyHours']]
-        y = df['Score']
-        
-        model = LinearRegression()
-        model.fit(X, y)
-
         try:
             hours = float(input("How many hours do you plan to study?\n-> "))
-            prediction = model.predict([[hours]])
-            print(f"Based on history, if you study {hours} hours, you might score: {prediction[0]:.2f}")
+            prediction = predictor.predict(hours)
+            print(f"Based on history, if you study {hours} hours, you might score: {prediction:.2f}")
         except ValueError:
             print("Invalid input.")
+            return
+
+        # The same hours for everyone, on top of each student's own subjects and credits
+        if self.get_cohort_model().ready():
+            current, projected = self.gpa_projection([hours])
+            if len(current):
+                projected = projected[:, 0]
+                print(f"If each of the {len(current)} graded students studied {hours} hours per subject next term:")
+                print(f"  average GPA {current.mean():.2f} now, {projected.mean():.2f} projected (by subject and credits)")
+
+        report = self.cross_validation()
+        if report is not None:
+            print(f"\nHow well each model predicts ({report['folds']}-fold cross-validation over {report['grades']} grades):")
+            print(f"{'Model':<34}{'RMSE':>8}{'MAE':>8}{'R^2':>8}")
+            for model, rmse, mae, r2 in summarize(report):
+                print(f"{model:<34}{rmse:>8.2f}{mae:>8.2f}{r2:>8.3f}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Student Record Management System')
+    parser.add_argument('--db', help='use this SQLite database instead of student_records.csv')
+    parser.add_argument('--import-csv', metavar='CSV', help='validate and add every record in CSV, then exit')
+    parser.add_argument('--chunk-size', type=int, default=50000, help='rows per --import-csv chunk')
+    parser.add_argument('--export-csv', metavar='CSV', help='write the --db database out as CSV and exit')
+    parser.add_argument('--workers', type=int, help='processes that parse a large student_records.csv (default: all cores)')
+    parser.add_argument('--scale', help='grading scale to use for GPAs and letters (default: Standard 4.0)')
+    parser.add_argument('--grading', metavar='JSON', default=POLICY_FILE, help='file the --scale is read from')
+    return parser.parse_args()
 
 def main():
-    system = StudentSystem()
+    args = parse_args()
+    if args.export_csv and not args.db:
+        print('--export-csv needs --db')
+        return
+    storage = SqliteStorage(args.db) if args.db else CsvStorage(workers=args.workers)
+    if args.export_csv:
+        storage.export_csv(args.export_csv)
+        print(f'Exported {args.db} to {args.export_csv}')
+        return
+    try:
+        policy = get_policy(args.scale, args.grading)
+    except (OSError, ValueError) as e:
+        print(f'Could not load grading scale: {e}')
+        return
+
+    system = StudentSystem(storage, policy)
     system.load_data()
+    if args.import_csv:
+        try:
+            import_csv(system, args.import_csv, args.chunk_size)
+        except (OSError, ValueError) as e:
+            print(f'Import failed: {e}')
+        return
     
     while True:
-        menu = '\n1) Add Student\n2) Add Grade\n3) Calculate GPA (one student)\n4) View Records\n5) Predict Score (Phase 3)\n0) Exit'
+        menu = '\n1) Add Student\n2) Add Grade\n3) Calculate GPA (one student)\n4) View Records\n5) Predict Score (Phase 3)\n6) Subject Report\n7) Class Ranking\n0) Exit'
         print(menu)
         while True:
             try:
@@ -231,7 +449,7 @@ def main():
                     raise ValueError
                 break
             except ValueError:
-                    print('Please enter a number (0-5)')
+                    print('Please enter a number (0-7)')
 
         if choice == '1':
             id, name = system.get_student_info() 
@@ -254,39 +472,43 @@ def main():
                     except ValueError:
                         print('Please enter a number')
                 
-                for num in range(subject_num):
-                    print(f'----Subject number ({num + 1})----')
-                    student_subject = input('Subject name\n-> ').title()
+                # Nothing is written until every subject is entered, then all at once
+                with system.batch() as batch:
+                    for num in range(subject_num):
+                        print(f'----Subject number ({num + 1})----')
+                        student_subject = input('Subject name\n-> ').strip().title()
+                        while not student_subject:
+                            student_subject = input('Subject name cannot be empty\n-> ').strip().title()
                     
-                    while True:
-                        try:
-                            student_score = int(input('Score (0-100)\n-> '))
-                            if not 0 <= student_score <= 100:
-                                raise ValueError
-                            break
-                        except ValueError:
-                            print('Score must be an integer between 0 and 100')
+                        while True:
+                            try:
+                                student_score = int(input('Score (0-100)\n-> '))
+                                if not 0 <= student_score <= 100:
+                                    raise ValueError
+                                break
+                            except ValueError:
+                                print('Score must be an integer between 0 and 100')
                     
-                    while True:
-                        try:
-                            student_credits = int(input('Credits\n-> '))
-                            if student_credits <= 0:
-                                raise ValueError
-                            break
-                        except:
-                            print('Invalid input. credit cannot be zero')
+                        while True:
+                            try:
+                                student_credits = int(input('Credits\n-> '))
+                                if student_credits <= 0:
+                                    raise ValueError
+                                break
+                            except:
+                                print('Invalid input. credit cannot be zero')
                     
-                    while True:
-                        try:
-                            study_hours = float(input('Hours Studied\n-> '))
-                            if study_hours < 0: raise ValueError
-                            break
-                        except:
-                            print('Invalid input.')
-
-                    system.add_grade(student_id, student_subject, student_score, student_credits, study_hours)
-                    system.save_data()
-                    print(f"Grade for {student_subject} saved.")
+                        while True:
+                            try:
+                                hours = input('Hours Studied (blank if unknown)\n-> ').strip()
+                                study_hours = float(hours) if hours else math.nan
+                                if study_hours < 0: raise ValueError
+                                break
+                            except:
+                                print('Invalid input.')
+
+                        batch.add_grade(student_id, student_subject, student_score, student_credits, study_hours)
+                print(f"{len(batch)} grade(s) for student {student_id} saved.")
         
         elif choice == '3':
             student_id = system.get_id()
@@ -296,14 +518,33 @@ def main():
                 student_search = system.search_by_id(student_id)
                 gpa = student_search.calculate_gpa()
                 print(f'GPA = {gpa:.2f}')
+                ranking = system.get_ranking()
+                rank = ranking.rank(student_id)
+                if rank:
+                    print(f'Class rank: {rank} of {len(ranking)} (percentile {ranking.percentile(student_id):.1f})')
         
         elif choice == '4':
             system.view_records()
         
         elif choice == '5':
             system.predict_score()
+
+        elif choice == '6':
+            system.view_report()
+
+        elif choice == '7':
+            while True:
+                try:
+                    count = int(input('How many top students\n-> '))
+                    if count <= 0:
+                        raise ValueError
+                    break
+                except ValueError:
+                    print('Please enter a positive number')
+            system.view_ranking(count)
             
         elif choice == '0':
+            system.compact()
             print("Exiting...")
             break
 
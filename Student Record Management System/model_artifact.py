@@ -0,0 +1,78 @@
+import json
+import hashlib
+from file_lock import atomic_write
+from predictor import CohortModel
+from cross_validation import cross_validate
+
+# 2: only subjects with grades are fitted; older files gave the others a 0 intercept
+VERSION = 2
+
+def model_filename(filename):
+    return filename + '.model'
+
+# Grade count plus a hash of the columns a CohortModel is fitted on (as
+# CohortModel.fit takes them). Hashing reads the buffers in place.
+def fingerprint(subject, subjects, score, credits, study_hours):
+    digest = hashlib.blake2b(digest_size=16)
+    for column in (score, study_hours, credits, subject):
+        digest.update(memoryview(column).cast('B'))
+    digest.update('\0'.join(subjects).encode('utf-8'))
+    return f'{len(score)}:{digest.hexdigest()}'
+
+# The fitted CohortModel and its cross-validation report, saved as JSON next to
+# the records (`<csv>.model`) with the fingerprint of the grades behind them, so
+# a restart with unchanged grades neither refits nor re-runs the folds. The file
+# is only a cache: whatever it holds for other grades is replaced, not used.
+class ModelArtifact:
+    def __init__(self, path):
+        self.path = path
+        self.fingerprint = None
+        self.model = None
+        self.report = None
+
+    def load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+        if saved.get('version') != VERSION:
+            return
+        import numpy as np
+        model = saved['model']
+        self.fingerprint = saved['fingerprint']
+        self.model = CohortModel(model['subjects'], np.array(model['coefficients'], dtype=np.float64), model['n'])
+        self.report = saved['report']
+
+    def save(self):
+        saved = {
+            'version': VERSION,
+            'fingerprint': self.fingerprint,
+            'model': {'subjects': self.model.subjects, 'coefficients': self.model.coefficients.tolist(), 'n': self.model.n},
+            'report': self.report,
+        }
+        with atomic_write(self.path) as f:
+            json.dump(saved, f)
+
+    # The model for these columns: the one in memory or on disk if the
+    # fingerprint matches, otherwise a fresh fit (which is saved)
+    def model_for(self, subject, subjects, score, credits, study_hours):
+        current = fingerprint(subject, subjects, score, credits, study_hours)
+        if self.fingerprint != current:
+            self.load()
+        if self.fingerprint != current:
+            self.fingerprint = current
+            self.model = CohortModel.fit(subject, subjects, score, credits, study_hours)
+            self.report = None
+            self.save()
+        return self.model
+
+    # Cross-validation report for these columns (see cross_validation.py), kept
+    # with the model; None with too few grades
+    def report_for(self, subject, subjects, score, credits, study_hours, folds=5, workers=None):
+        self.model_for(subject, subjects, score, credits, study_hours)
+        if self.report is None or self.report['folds'] != folds:
+            self.report = cross_validate(subject, subjects, score, credits, study_hours, folds, workers)
+            if self.report is not None:
+                self.save()
+        return self.report
@@ -0,0 +1,118 @@
+import gc
+from array import array
+from bisect import bisect_left, insort
+from itertools import islice
+
+def normalize(name):
+    return ' '.join(name.lower().split())
+
+# Trigrams of each word padded the way PostgreSQL's pg_trgm does ("  ab", " abc", "bc ")
+def trigrams(text):
+    grams = set()
+    for word in text.split():
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+# Name lookup over the roster. Prefix search walks a sorted list of
+# (word, id) pairs from the rarest query word, so "jo sm" finds "John Smith" in
+# O(log n + k). Typo-tolerant search counts the trigrams each student shares with
+# the query in one numpy.bincount over the posting lists, keeps students holding
+# at least `threshold` of the query's trigrams and orders them by Jaccard
+# similarity of the whole name (as pg_trgm does). Students are numbered in the
+# order they were indexed; posting lists hold those positions.
+class NameIndex:
+    def __init__(self, threshold=0.5):
+        self.threshold = threshold
+        self.clear()
+
+    def clear(self):
+        self.students = None
+        self.ids = []
+        self.names = {}
+        self.words = []
+        self.grams = {}
+        self.sizes = array('i')
+
+    def __len__(self):
+        return len(self.ids)
+
+    # Indexes everything but the sorted word list; returns the name's words
+    def index_name(self, id, name):
+        name = normalize(name)
+        position = len(self.ids)
+        self.ids.append(id)
+        self.names[id] = name
+        grams = trigrams(name)
+        self.sizes.append(len(grams))
+        for gram in grams:
+            postings = self.grams.get(gram)
+            if postings is None:
+                postings = self.grams[gram] = array('i')
+            postings.append(position)
+        return set(name.split())
+
+    def add(self, id, name):
+        for word in self.index_name(id, name):
+            insort(self.words, (word, id))
+
+    # Catches up with a students dict ({id: student with .name}). Students are
+    # only ever added, so anything past len(self) is new; another dict means a reload.
+    def refresh(self, students):
+        if students is not self.students or len(students) < len(self):
+            self.clear()
+            self.students = students
+            gc_was_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                # One sort for the whole roster rather than an insort per word
+                for student in students.values():
+                    self.words.extend((word, student.id) for word in self.index_name(student.id, student.name))
+                self.words.sort()
+            finally:
+                if gc_was_enabled:
+                    gc.enable()
+        elif len(students) > len(self):
+            for student in islice(students.values(), len(self), None):
+                self.add(student.id, student.name)
+
+    def prefix(self, query, limit):
+        words = normalize(query).split()
+        if not words:
+            return []
+        # Walk the range of the word with the fewest candidates
+        ranges = [(bisect_left(self.words, (word,)), bisect_left(self.words, (word + '\uffff',))) for word in words]
+        low, high = min(ranges, key=lambda r: r[1] - r[0])
+        found = []
+        seen = set()
+        for i in range(low, high):
+            word, id = self.words[i]
+            if len(found) >= limit:
+                break
+            if id in seen:
+                continue
+            seen.add(id)
+            name_words = self.names[id].split()
+            if all(any(name_word.startswith(w) for name_word in name_words) for w in words):
+                found.append(id)
+        return found
+
+    def fuzzy(self, query, limit):
+        import numpy as np
+        grams = trigrams(normalize(query))
+        postings = [np.frombuffer(self.grams[gram], dtype=np.int32) for gram in grams if gram in self.grams]
+        if not postings:
+            return []
+        shared = np.bincount(np.concatenate(postings), minlength=len(self.ids))
+        matches = np.flatnonzero(shared >= self.threshold * len(grams))
+        similarity = shared / (len(grams) + np.frombuffer(self.sizes, dtype=np.int32) - shared)
+        best = matches[np.argsort(-similarity[matches], kind='stable')[:limit]]
+        return [self.ids[position] for position in best]
+
+    # Up to `limit` IDs: prefix matches first, then the closest typo-tolerant ones
+    def search(self, query, limit=20):
+        found = self.prefix(query, limit)
+        if len(found) < limit:
+            seen = set(found)
+            found += [id for id in self.fuzzy(query, limit) if id not in seen][:limit - len(found)]
+        return found
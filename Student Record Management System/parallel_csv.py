@@ -0,0 +1,158 @@
+import io
+import os
+import gc
+import csv
+import math
+from array import array
+from itertools import repeat
+from predictor import ScorePredictor
+
+# Below this size one process parses the file sooner than a pool of workers starts up
+MIN_PARALLEL_BYTES = 8 * 1024 * 1024
+
+# The header's field names and `parts` byte ranges covering the rows after it,
+# each starting and ending on a line boundary. Like read_new_lines() this relies
+# on no field holding a line break, which nothing in this project writes.
+def split_ranges(filename, parts):
+    size = os.path.getsize(filename)
+    with open(filename, 'rb') as f:
+        header = f.readline()
+        start = f.tell()
+        fieldnames = next(csv.reader([header.decode('utf-8')]), [])
+        if start == size:
+            return fieldnames, []
+        bounds = [start]
+        for k in range(1, parts):
+            f.seek(max(start + (size - start) * k // parts, bounds[-1]) - 1)
+            f.readline()
+            bounds.append(f.tell())
+    bounds.append(size)
+    return fieldnames, [(low, high) for low, high in zip(bounds, bounds[1:]) if high > low]
+
+# Parses the rows in [start, end) with the same rules as storage.read_csv() and
+# returns them column by column, ready to be appended to a GradeStore:
+#   ids, names            students in the order they first appear in the range
+#   counts, rows          how many grades each of them has here, and the range's
+#                         row numbers of those grades, student by student in file order
+#   points, credit_totals grade points x credits and credits per student, under `policy`
+#   subjects, owner, subject, score, credits, study_hours
+#                         the grades, with owner/subject numbering the students
+#                         and subjects of this range
+#   predictor             a ScorePredictor over the range's grades
+def parse_range(filename, fieldnames, start, end, policy):
+    with open(filename, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode('utf-8')
+    width = len(fieldnames)
+    column = {name: i for i, name in enumerate(fieldnames)}
+    id_col, name_col, subject_col, score_col, credits_col = (column[name] for name in ('ID', 'Name', 'Subject', 'Score', 'Credits'))
+    hours_col = column.get('StudyHours')
+
+    positions = {}
+    ids, names, student_rows = array('q'), [], []
+    points, credit_totals = array('d'), array('d')
+    subjects, subject_ids = [], {}
+    owner, subject, score, credits, study_hours = array('i'), array('i'), array('d'), array('d'), array('d')
+    predictor = ScorePredictor()
+    for row in csv.reader(io.StringIO(text)):
+        if len(row) < width:
+            row += [''] * (width - len(row))
+        try:
+            id = int(row[id_col])
+        except ValueError:
+            continue
+        try:
+            hours = float(row[hours_col]) if hours_col is not None and row[hours_col] else math.nan
+            grade = (row[subject_col], float(row[score_col]), float(row[credits_col]), hours) if row[subject_col] else None
+        except ValueError:
+            grade = None
+
+        position = positions.get(id)
+        if position is None:
+            position = positions[id] = len(ids)
+            ids.append(id)
+            names.append(row[name_col])
+            student_rows.append(array('i'))
+            points.append(0.0)
+            credit_totals.append(0.0)
+        if grade:
+            name, grade_score, grade_credits, hours = grade
+            subject_id = subject_ids.get(name)
+            if subject_id is None:
+                subject_id = subject_ids[name] = len(subjects)
+                subjects.append(name)
+            student_rows[position].append(len(score))
+            owner.append(position)
+            subject.append(subject_id)
+            score.append(grade_score)
+            credits.append(grade_credits)
+            study_hours.append(hours)
+            points[position] += policy.points(grade_score) * grade_credits
+            credit_totals[position] += grade_credits
+            predictor.add(hours, grade_score)
+
+    counts = array('i', map(len, student_rows))
+    rows = array('i')
+    for part in student_rows:
+        rows.extend(part)
+    return ids, names, counts, rows, points, credit_totals, subjects, owner, subject, score, credits, study_hours, predictor
+
+# array('i') of the int32 NumPy array `values`
+def int_array(values):
+    result = array('i')
+    result.frombytes(values.astype('int32').tobytes())
+    return result
+
+# Adds one parsed range to the system. Ranges must arrive in file order, so that
+# a student's rows - including those of one straddling two ranges - stay in file
+# order. This part runs in one process, so everything done per grade is vectorized.
+def merge_range(system, parsed):
+    import numpy as np
+    ids, names, counts, rows, points, credit_totals, subjects, owner, subject, score, credits, study_hours, predictor = parsed
+    store = system.store
+    rows = int_array(np.frombuffer(rows, dtype=np.int32) + len(store))
+    index = array('i')
+    start = 0
+    for id, name, count, total_points, total_credits in zip(ids, names, counts, points, credit_totals):
+        student = system.students.get(id) or system.new_student(id, name)
+        index.append(student.index)
+        if count:
+            if student.rows:
+                student.rows.extend(rows[start:start + count])
+            else:
+                student.rows = rows[start:start + count]
+            student.total_points += total_points
+            student.total_credits += total_credits
+            start += count
+    remap = np.array([store.intern(name) for name in subjects], dtype=np.int32)
+    store.extend(int_array(np.frombuffer(index, dtype=np.int32)[np.frombuffer(owner, dtype=np.int32)]),
+                 int_array(remap[np.frombuffer(subject, dtype=np.int32)]),
+                 score, credits, study_hours, predictor)
+
+# Loads `filename` into `system` (its students dict, new_student() and GradeStore)
+# with `workers` processes each parsing a slice of the file, merging the slices
+# in file order as they come back. Returns the header's field names and the
+# offset just past the last byte parsed.
+def load_parallel(filename, system, workers):
+    # Imported here: they would double the CLI's start-up time
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    fieldnames, ranges = split_ranges(filename, workers)
+    if not ranges:
+        return fieldnames, os.path.getsize(filename)
+    policy = system.store.policy
+    starts, ends = zip(*ranges)
+    # Fresh interpreters rather than forks, which could inherit a lock some
+    # other thread (a Streamlit server's, say) was holding
+    with ProcessPoolExecutor(min(workers, len(ranges)), mp_context=multiprocessing.get_context('spawn')) as pool:
+        parsed = pool.map(parse_range, repeat(filename), repeat(fieldnames), starts, ends, repeat(policy))
+        # As in load_binary(), nothing built here forms a cycle
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for part in parsed:
+                merge_range(system, part)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+    return fieldnames, ends[-1]
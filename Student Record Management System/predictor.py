@@ -0,0 +1,152 @@
+# Least-squares fit of Score on StudyHours kept as running statistics, so adding
+# a grade and predicting are both O(1). Means and co-moments are updated the
+# Welford way, which stays accurate where raw sums of squares would cancel.
+class ScorePredictor:
+    MIN_RECORDS = 5
+
+    def __init__(self):
+        self.n = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.sxx = 0.0
+        self.sxy = 0.0
+
+    @classmethod
+    def from_sums(cls, n, sum_x, sum_y, sum_xx, sum_xy):
+        predictor = cls()
+        if n:
+            predictor.n = n
+            predictor.mean_x = sum_x / n
+            predictor.mean_y = sum_y / n
+            predictor.sxx = sum_xx - sum_x * sum_x / n
+            predictor.sxy = sum_xy - sum_x * sum_y / n
+        return predictor
+
+    # A grade without study hours (NaN) says nothing about them and is skipped
+    def add(self, hours, score):
+        if hours != hours:
+            return
+        self.n += 1
+        dx = hours - self.mean_x
+        self.mean_x += dx / self.n
+        self.mean_y += (score - self.mean_y) / self.n
+        self.sxx += dx * (hours - self.mean_x)
+        self.sxy += dx * (score - self.mean_y)
+
+    # Folds in the statistics of another set of grades (Chan et al.'s pairwise update)
+    def merge(self, other):
+        if not other.n:
+            return
+        n = self.n + other.n
+        dx = other.mean_x - self.mean_x
+        dy = other.mean_y - self.mean_y
+        self.sxx += other.sxx + dx * dx * self.n * other.n / n
+        self.sxy += other.sxy + dx * dy * self.n * other.n / n
+        self.mean_x += dx * other.n / n
+        self.mean_y += dy * other.n / n
+        self.n = n
+
+    def ready(self):
+        return self.n >= self.MIN_RECORDS
+
+    def coefficients(self):
+        slope = self.sxy / self.sxx if self.sxx > 0 else 0.0
+        return slope, self.mean_y - slope * self.mean_x
+
+    def predict(self, hours):
+        slope, intercept = self.coefficients()
+        return intercept + slope * hours
+
+    # Refits with scikit-learn on the grades with study hours and checks both models agree
+    def verify(self, hours, scores, tolerance=1e-6):
+        import numpy as np
+        from sklearn.linear_model import LinearRegression
+        hours, scores = np.asarray(hours, dtype=np.float64), np.asarray(scores, dtype=np.float64)
+        known = ~np.isnan(hours)
+        if not known.any():
+            return self.n == 0
+        model = LinearRegression().fit(hours[known].reshape(-1, 1), scores[known])
+        return np.allclose([model.coef_[0], model.intercept_], self.coefficients(), rtol=tolerance, atol=tolerance)
+
+# Least-squares fit of Score on StudyHours, Credits and the subject, one-hot
+# encoded over the interned subject list (so every subject gets its own
+# intercept). The normal equations come from a few dot products and per-subject
+# np.bincount sums, so fitting never builds the one-hot matrix, and a whole
+# roster is scored by one broadcast over its grade rows.
+class CohortModel:
+    MIN_RECORDS = 5
+
+    # `coefficients` is [hours, credits, subject 0, subject 1, ...]
+    def __init__(self, subjects, coefficients, n):
+        self.subjects = list(subjects)
+        self.coefficients = coefficients
+        self.n = n
+
+    # Columns as GradeStore.columns() gives them, with `subjects` the interned names.
+    # Grades without study hours (NaN) are left out. Only subjects with grades left
+    # get an intercept and a place in the model's `subjects`: an empty one would
+    # get 0 from lstsq, so the rest are treated as never seen (see effects).
+    @classmethod
+    def fit(cls, subject, subjects, score, credits, study_hours):
+        import numpy as np
+        subject = np.asarray(subject, dtype=np.intp)
+        score, credits, study_hours = (np.asarray(column, dtype=np.float64) for column in (score, credits, study_hours))
+        known = ~np.isnan(study_hours)
+        if not known.all():
+            subject, score, credits, study_hours = subject[known], score[known], credits[known], study_hours[known]
+        seen = np.flatnonzero(np.bincount(subject, minlength=len(subjects)))
+        count = len(seen)
+        if count < len(subjects):
+            renumber = np.zeros(len(subjects), dtype=np.intp)
+            renumber[seen] = np.arange(count)
+            subject = renumber[subject]
+            subjects = [subjects[i] for i in seen]
+        xtx = np.zeros((count + 2, count + 2))
+        xty = np.zeros(count + 2)
+        features = (study_hours, credits)
+        for i, feature in enumerate(features):
+            for j, other in enumerate(features):
+                xtx[i, j] = feature @ other
+            xtx[i, 2:] = xtx[2:, i] = np.bincount(subject, weights=feature, minlength=count)
+            xty[i] = feature @ score
+        xtx[2:, 2:] = np.diag(np.bincount(subject, minlength=count).astype(np.float64))
+        xty[2:] = np.bincount(subject, weights=score, minlength=count)
+        # lstsq rather than solve: constant credits, say, make the system singular
+        return cls(subjects, np.linalg.lstsq(xtx, xty, rcond=None)[0], len(score))
+
+    def ready(self):
+        return self.n >= self.MIN_RECORDS
+
+    # Intercepts of the subjects named in `names`; one the fit never saw gets the
+    # average over the fitted subjects
+    def effects(self, names):
+        import numpy as np
+        fitted = dict(zip(self.subjects, self.coefficients[2:]))
+        default = float(np.mean(self.coefficients[2:])) if self.subjects else 0.0
+        return np.array([fitted.get(name, default) for name in names], dtype=np.float64)
+
+    # Predicted scores (clipped to 0-100); the arguments broadcast against each
+    # other, with `subject` numbering `subjects` (by default the fit's own list)
+    def predict(self, study_hours, credits, subject, subjects=None):
+        import numpy as np
+        hours_coef, credits_coef = self.coefficients[:2]
+        effects = self.coefficients[2:] if subjects is None else self.effects(subjects)
+        subject_coef = effects[np.asarray(subject, dtype=np.intp)]
+        return np.clip(hours_coef * np.asarray(study_hours) + credits_coef * np.asarray(credits) + subject_coef, 0, 100)
+
+    # Projected next-term GPAs, students x planned hours, for every student
+    # 0..count-1 retaking their current subjects and credits while studying each
+    # of `planned_hours` per subject. Grade rows are (student, subject, credits)
+    # columns, `subject` numbering `subjects`; students without grades get 0.
+    def project_gpas(self, student, subject, subjects, credits, count, planned_hours, policy):
+        import numpy as np
+        student = np.asarray(student, dtype=np.intp)
+        credits = np.asarray(credits, dtype=np.float64)
+        planned_hours = np.asarray(planned_hours, dtype=np.float64)
+        scores = self.predict(planned_hours[None, :], credits[:, None], np.asarray(subject)[:, None], subjects)
+        points = policy.points_array(scores) * credits[:, None]
+        cells = student[:, None] * len(planned_hours) + np.arange(len(planned_hours))
+        total_points = np.bincount(cells.ravel(), weights=points.ravel(), minlength=count * len(planned_hours))
+        total_credits = np.bincount(student, weights=credits, minlength=count)[:, None]
+        total_points = total_points.reshape(count, len(planned_hours))
+        return np.divide(total_points, total_credits, out=np.zeros_like(total_points), where=total_credits != 0)
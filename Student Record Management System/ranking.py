@@ -0,0 +1,54 @@
+from bisect import bisect_left, bisect_right, insort
+
+# Students with at least one credit ordered by GPA, best first and ties by ID,
+# as a sorted list of (-gpa, id) keys. Rank and percentile are two binary
+# searches, top(k) is a slice, and update() moves one student (a binary search
+# plus a memmove of the list). `rows` is how many grades of `store` it reflects;
+# grades that reach the store any other way make it stale (see current()).
+class GpaRanking:
+    def __init__(self, students, store):
+        self.store = store
+        self.rows = len(store)
+        self.entries = {}
+        for student in students:
+            if student.total_credits:
+                self.entries[student.id] = (-student.calculate_gpa(), student.id)
+        self.keys = sorted(self.entries.values())
+
+    def __len__(self):
+        return len(self.keys)
+
+    def current(self, store):
+        return store is self.store and self.rows == len(store)
+
+    # Re-files `student` after its GPA changed; call right after the grade that changed it
+    def update(self, student):
+        old = self.entries.pop(student.id, None)
+        if old is not None:
+            del self.keys[bisect_left(self.keys, old)]
+        if student.total_credits:
+            key = (-student.calculate_gpa(), student.id)
+            self.entries[student.id] = key
+            insort(self.keys, key)
+        self.rows = len(self.store)
+
+    # 1 + the number of students with a strictly higher GPA, or None without a GPA
+    def rank(self, id):
+        key = self.entries.get(id)
+        if key is None:
+            return None
+        return bisect_left(self.keys, (key[0],)) + 1
+
+    # Percentile rank: the share of students below, counting ties as half below
+    def percentile(self, id):
+        key = self.entries.get(id)
+        if key is None:
+            return None
+        above = bisect_left(self.keys, (key[0],))
+        equal = bisect_right(self.keys, (key[0], float('inf'))) - above
+        below = len(self.keys) - above - equal
+        return 100 * (below + equal / 2) / len(self.keys)
+
+    # [(id, gpa)] of the k best students
+    def top(self, k):
+        return [(id, -gpa) for gpa, id in self.keys[:k]]
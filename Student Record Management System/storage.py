@@ -0,0 +1,278 @@
+import os
+import csv
+import math
+import sqlite3
+from contextlib import contextmanager
+from array import array
+from itertools import groupby
+from journal import Journal, file_stamp
+from file_lock import lock_for, atomic_write
+from binary_snapshot import write_binary, load_binary
+from predictor import ScorePredictor
+from parallel_csv import load_parallel, MIN_PARALLEL_BYTES
+
+HEADER = ['ID', 'Name', 'Subject', 'Score', 'Credits', 'StudyHours']
+
+# Yields (id, name, grade) per row, grade being None for a student without grades
+def read_csv(filename):
+    with open(filename, 'r', newline='', encoding='utf-8') as csvfile:
+        for row in csv.DictReader(csvfile):
+            try:
+                id = int(row['ID'])
+            except ValueError:
+                continue
+            try:
+                study_hours = float(row['StudyHours']) if row.get('StudyHours') else math.nan
+                grade = (row['Subject'], float(row['Score']), float(row['Credits']), study_hours) if row['Subject'] else None
+            except ValueError:
+                grade = None
+            yield id, row['Name'], grade
+
+# `students` is an iterable of (id, name, grades) with grades as (subject, score,
+# credits, study_hours); missing study hours (NaN) are written as a blank cell
+def write_csv(filename, students):
+    with atomic_write(filename) as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(HEADER)
+        for id, name, grades in students:
+            if not grades:
+                writer.writerow([id, name, '', '', '', ''])
+            for subject, score, credits, study_hours in grades:
+                writer.writerow([id, name, subject, score, credits, '' if math.isnan(study_hours) else study_hours])
+
+# Applies a journal record ('S', id, name) or ('G', id, subject, score, credits, study_hours)
+def apply_record(system, record):
+    if record[0] == 'S':
+        _, id, name = record
+        if id not in system.students:
+            system.new_student(id, name)
+    elif record[0] == 'G':
+        _, id, *grade = record
+        if id in system.students:
+            system.students[id].add_grade(*grade)
+
+# student_records.csv snapshot plus an append-only journal (see journal.py).
+# The whole roster lives in memory. Several processes may share the files:
+# reads hold the shared file lock, writes the exclusive one. A large CSV is
+# parsed by `workers` processes (all cores by default, see parallel_csv.py).
+class CsvStorage:
+    lazy = False
+
+    def __init__(self, filename='student_records.csv', journaled=True, compact_every=10000, workers=None):
+        self.filename = filename
+        self.journaled = journaled
+        self.compact_every = compact_every
+        self.workers = workers or os.cpu_count() or 1
+        self.journal = Journal(filename)
+        self.lock = lock_for(filename)
+        self.snapshot_seen = None
+        self.unsaved = False
+
+    def load(self, system):
+        with self.lock.hold(exclusive=False):
+            self.snapshot_seen = file_stamp(self.filename)
+            if self.snapshot_seen is None:
+                print('File not found. Starting fresh.')
+            elif not load_binary(self.filename, self.snapshot_seen, system):
+                if self.workers > 1 and self.snapshot_seen[1] >= MIN_PARALLEL_BYTES:
+                    load_parallel(self.filename, system, self.workers)
+                else:
+                    for id, name, grade in read_csv(self.filename):
+                        student = system.students.get(id) or system.new_student(id, name)
+                        if grade:
+                            student.add_grade(*grade)
+
+            for record in self.journal.replay():
+                apply_record(system, record)
+
+    # Whether another process has written since sync() or load() last ran (only
+    # stat() calls, cheap enough to check on every UI rerun)
+    def changed(self):
+        journal = file_stamp(self.journal.filename)
+        return file_stamp(self.filename) != self.snapshot_seen or (journal[1] if journal else 0) != self.journal.offset
+
+    # Picks up what other processes committed since this one last read or wrote
+    # the files, so that a compaction here cannot drop their records
+    def sync(self, system):
+        if file_stamp(self.filename) != self.snapshot_seen:
+            pending = self.journal.pending
+            system.reload()
+            for record in pending:
+                apply_record(system, record)
+            self.journal.pending = pending
+        else:
+            for record in self.journal.replay(self.journal.offset):
+                apply_record(system, record)
+
+    # Holds the exclusive lock from the latest state until the caller is done, so
+    # checks made against the roster stay true until the save (the API's write
+    # batches), and rows merged in memory without journaling (a bulk import)
+    # cannot be dropped by another process compacting before they are written out
+    @contextmanager
+    def exclusive(self, system):
+        with self.lock.hold():
+            self.sync(system)
+            yield
+
+    def add_student(self, id, name):
+        if self.journaled:
+            self.journal.log_student(id, name)
+
+    def add_grade(self, id, subject, score, credits, study_hours):
+        if self.journaled:
+            self.journal.log_grade(id, subject, score, credits, study_hours)
+
+    def commit(self, system):
+        with self.lock.hold():
+            self.sync(system)
+            if not self.journaled:
+                self.write_snapshot(system)
+                return
+            self.journal.flush()
+            if self.journal.records >= self.compact_every:
+                self.compact(system)
+
+    # Folds the journal into the snapshot; with no journal file, nothing pending
+    # and no merged rows the files already hold the roster and are left alone
+    def compact(self, system):
+        with self.lock.hold():
+            self.sync(system)
+            if not (self.unsaved or self.journal.pending or os.path.isfile(self.journal.filename)):
+                return
+            self.write_snapshot(system)
+            self.journal.clear()
+
+    def write_snapshot(self, system):
+        write_csv(self.filename, ((student.id, student.name, [student.store.get(row) for row in student.rows])
+                                  for student in system.students.values()))
+        self.snapshot_seen = file_stamp(self.filename)
+        write_binary(self.filename, self.snapshot_seen, system.students.values(), system.store)
+        self.unsaved = False
+
+    # Rows merged in memory are not journaled, the next compact() writes them out
+    def merge_rows(self, rows):
+        self.unsaved = True
+
+# SQLite NULL for missing study hours is NaN in memory, as in GradeStore
+def sql_grade(subject, score, credits, study_hours):
+    return subject, score, credits, math.nan if study_hours is None else study_hours
+
+# SQLite database in WAL mode. Students are fetched on demand through the primary
+# key, so the roster does not have to fit in memory. Missing study hours are NULL.
+class SqliteStorage:
+    lazy = True
+
+    def __init__(self, filename='student_records.db'):
+        self.filename = filename
+        self.conn = sqlite3.connect(filename)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS students (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS grades (
+                student_id INTEGER NOT NULL REFERENCES students(id),
+                subject TEXT NOT NULL,
+                score REAL NOT NULL,
+                credits REAL NOT NULL,
+                study_hours REAL
+            );
+            CREATE INDEX IF NOT EXISTS grades_student ON grades(student_id);
+            CREATE INDEX IF NOT EXISTS grades_subject ON grades(subject);
+        ''')
+
+    def load(self, system):
+        pass
+
+    # Imported rows go straight into the database, which does its own locking
+    @contextmanager
+    def exclusive(self, system):
+        yield
+
+    def find_student(self, id):
+        row = self.conn.execute('SELECT name FROM students WHERE id = ?', (id,)).fetchone()
+        if row is None:
+            return None
+        grades = self.conn.execute('SELECT subject, score, credits, study_hours FROM grades '
+                                   'WHERE student_id = ? ORDER BY rowid', (id,))
+        return row[0], [sql_grade(*grade) for grade in grades]
+
+    # [(id, name)] of students with a name word starting with `prefix` (LIKE ignores case)
+    def find_names(self, prefix, limit):
+        prefix = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        return self.conn.execute("SELECT id, name FROM students WHERE name LIKE ? ESCAPE '\\' "
+                                 "OR name LIKE ? ESCAPE '\\' LIMIT ?",
+                                 (prefix + '%', '% ' + prefix + '%', limit)).fetchall()
+
+    # Streams (id, name, grades) for the whole roster without holding it in memory
+    def iter_students(self):
+        rows = self.conn.execute('SELECT s.id, s.name, g.subject, g.score, g.credits, g.study_hours '
+                                 'FROM students s LEFT JOIN grades g ON g.student_id = s.id '
+                                 'ORDER BY s.id, g.rowid')
+        for (id, name), group in groupby(rows, key=lambda row: row[:2]):
+            yield id, name, [sql_grade(*row[2:]) for row in group if row[2] is not None]
+
+    # Regression statistics straight from SQL, without pulling the grades into Python
+    def predictor(self):
+        return ScorePredictor.from_sums(*self.conn.execute(
+            'SELECT COUNT(*), TOTAL(study_hours), TOTAL(score), TOTAL(study_hours * study_hours), '
+            'TOTAL(study_hours * score) FROM grades WHERE study_hours IS NOT NULL').fetchone())
+
+    # (subject_ids, subjects, scores, credits) of every grade, for analytics.py,
+    # plus a study_hours column if asked (for predictor.CohortModel)
+    def grade_columns(self, study_hours=False):
+        subjects = []
+        subject_ids = {}
+        ids, scores, credits, hours = array('i'), array('d'), array('d'), array('d')
+        for subject, score, credit, hour in self.conn.execute('SELECT subject, score, credits, study_hours FROM grades'):
+            if subject not in subject_ids:
+                subject_ids[subject] = len(subjects)
+                subjects.append(subject)
+            ids.append(subject_ids[subject])
+            scores.append(score)
+            credits.append(credit)
+            hours.append(math.nan if hour is None else hour)
+        return (ids, subjects, scores, credits, hours) if study_hours else (ids, subjects, scores, credits)
+
+    # (student numbers, students, subject_ids, subjects, scores, credits) of every
+    # grade, the graded students numbered 0..students-1, for whole-roster GPAs
+    def student_columns(self):
+        subjects = []
+        subject_ids = {}
+        numbers = {}
+        students, ids, scores, credits = array('i'), array('i'), array('d'), array('d')
+        for id, subject, score, credit in self.conn.execute('SELECT student_id, subject, score, credits FROM grades'):
+            if subject not in subject_ids:
+                subject_ids[subject] = len(subjects)
+                subjects.append(subject)
+            students.append(numbers.setdefault(id, len(numbers)))
+            ids.append(subject_ids[subject])
+            scores.append(score)
+            credits.append(credit)
+        return students, len(numbers), ids, subjects, scores, credits
+
+    def add_student(self, id, name):
+        self.conn.execute('INSERT INTO students (id, name) VALUES (?, ?)', (id, name))
+
+    def add_grade(self, id, subject, score, credits, study_hours):
+        self.conn.execute('INSERT INTO grades (student_id, subject, score, credits, study_hours) VALUES (?, ?, ?, ?, ?)',
+                          (id, subject, score, credits, study_hours))
+
+    def commit(self, system):
+        self.conn.commit()
+
+    def compact(self, system):
+        self.conn.commit()
+        self.conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+    # rows are (id, name, subject, score, credits, study_hours); subject is None for a bare student
+    def merge_rows(self, rows):
+        self.conn.executemany('INSERT OR IGNORE INTO students (id, name) VALUES (?, ?)',
+                              ((row[0], row[1]) for row in rows))
+        self.conn.executemany('INSERT INTO grades (student_id, subject, score, credits, study_hours) VALUES (?, ?, ?, ?, ?)',
+                              (row[:1] + row[2:] for row in rows if row[2] is not None))
+
+    def export_csv(self, filename):
+        write_csv(filename, self.iter_students())
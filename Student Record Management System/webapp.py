@@ -1,118 +1,169 @@
 import streamlit as st
 import pandas as pd
-import os
-import csv
-from sklearn.linear_model import LinearRegression
-import numpy as np
-
-class Student:
-    def __init__(self, id, name):
-        self.id = id
-        self.name = name
-        self.grades = []
-
-    def add_grade(self, subject, score, credits, study_hours):
-        self.grades.append({
-            'Subject': subject,
-            'Score': score,
-            'Credits': credits,
-            'StudyHours': study_hours
-        })
-
-    def calculate_gpa(self):
-        total_points = 0
-        total_credits = 0
-        for grade in self.grades:
-            points = self.get_grade_points(grade['Score'])
-            total_points += points * grade['Credits']
-            total_credits += grade['Credits']
-        
-        return 0.0 if total_credits == 0 else total_points / total_credits
-
-    def get_grade_points(self, score):
-        if score >= 93: return 4.0
-        elif score >= 90: return 3.7
-        elif score >= 87: return 3.3
-        elif score >= 83: return 3.0
-        elif score >= 80: return 2.7
-        elif score >= 77: return 2.3
-        elif score >= 73: return 2.0
-        elif score >= 70: return 1.7
-        elif score >= 67: return 1.3
-        elif score >= 60: return 1.0
-        else: return 0.0
-
-class StudentSystem:
-    def __init__(self):
-        self.students = {}
-        self.filename = 'student_records.csv'
+import math
+import threading
+from main2 import Student, StudentSystem as Records
+from rwlock import RWLock
+from storage import CsvStorage
+from batch import Batch
+from cross_validation import summarize
+from grading import load_policies
+
+# main2's StudentSystem, shared by every browser session: page renders read under
+# lock.read(), and anything that changes the roster runs under lock.write()
+class StudentSystem(Records):
+    def __init__(self, journaled=True, compact_every=10000, policy=None, workers=None):
+        # The CSV, its journal, the binary snapshot and the parallel parser, as in
+        # main2.py. Other server processes and the CLI may share the files: reads
+        # hold the shared file lock, writes catch up with the files and then hold
+        # it exclusively (see storage.py).
+        super().__init__(CsvStorage('student_records.csv', journaled, compact_every, workers), policy)
+        self.lock = RWLock()
+        # Readers share lock.read(), so the name index's own catch-up and the model
+        # fit each need a mutex
+        self.names_lock = threading.Lock()
+        self.model_lock = threading.Lock()
+        self.report_cache = (None, None)
+        self.validation_cache = (None, None)
         self.load_data()
 
-    def add_student(self, id, name):
-        if id in self.students:
+    def add_student(self, student):
+        try:
+            self.apply_batch([('S', student.id, student.name)])
+            return True
+        except ValueError:
             return False
-        self.students[id] = Student(id, name)
-        self.save_data()
-        return True
 
     def add_grade(self, id, subject, score, credits, study_hours):
-        if id in self.students:
-            self.students[id].add_grade(subject, score, credits, study_hours)
-            self.save_data()
+        try:
+            self.apply_batch([('G', id, subject, score, credits, study_hours)])
             return True
-        return False
-
-    def save_data(self):
-        with open(self.filename, mode='w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(['ID', 'Name', 'Subject', 'Score', 'Credits', 'StudyHours'])
-            for s in self.students.values():
-                if not s.grades:
-                    writer.writerow([s.id, s.name, '', '', '', ''])
+        except ValueError:
+            return False
+
+    # All or nothing: after catching up with the files every record is checked
+    # against the current roster again before any of them is applied
+    def apply_batch(self, records):
+        with self.lock.write(), self.storage.exclusive(self):
+            batch = Batch(lambda id: id in self.students)
+            for record in records:
+                if record[0] == 'S':
+                    batch.add_student(*record[1:])
+                else:
+                    batch.add_grade(*record[1:])
+            for record in batch.records:
+                if record[0] == 'S':
+                    Records.add_student(self, Student(record[1], record[2]))
                 else:
-                    for g in s.grades:
-                        writer.writerow([s.id, s.name, g['Subject'], g['Score'], g['Credits'], g.get('StudyHours', 0)])
+                    Records.add_grade(self, *record[1:])
+            self.save_data()
 
-    def load_data(self):
-        if not os.path.exists(self.filename): return
-        try:
-            with open(self.filename, 'r') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    try:
-                        uid = int(row['ID'])
-                        if uid not in self.students:
-                            self.students[uid] = Student(uid, row['Name'])
-                        
-                        if row['Subject']:
-                            self.students[uid].add_grade(
-                                row['Subject'], 
-                                float(row['Score']), 
-                                float(row['Credits']),
-                                float(row['StudyHours']) if row.get('StudyHours') else 0.0
-                            )
-                    except ValueError: continue
-        except Exception: pass
-
-    def get_all_ids(self):
-        return list(self.students.keys())
+    def compact(self):
+        with self.lock.write():
+            super().compact()
+
+    # CsvStorage.sync calls this when another process rewrote the CSV
+    def reload(self):
+        self.report_cache = (None, None)
+        self.validation_cache = (None, None)
+        super().reload()
+
+    # Called on every Streamlit rerun; the write lock is only taken once the
+    # files have changed
+    def refresh(self):
+        if not self.storage.changed():
+            return False
+        with self.lock.write():
+            return super().refresh()
+
+    def find_students(self, query):
+        with self.lock.read():
+            return super().find_students(query)
+
+    # Cached until the grades change: they are only ever appended and reload drops
+    # the cache, so the length identifies the data
+    def grade_report(self):
+        with self.lock.read():
+            key = len(self.store)
+            if self.report_cache[0] != key:
+                self.report_cache = (key, super().grade_report())
+            return self.report_cache[1]
+
+    def get_cohort_model(self):
+        with self.model_lock:
+            return super().get_cohort_model()
+
+    def cohort_model(self):
+        with self.lock.read():
+            return self.get_cohort_model()
+
+    # k-fold cross-validation of both predictors, cached like grade_report
+    def cross_validation(self, folds=5):
+        with self.lock.read(), self.model_lock:
+            key = (len(self.store), folds)
+            if self.validation_cache[0] != key:
+                self.validation_cache = (key, super().cross_validation(folds))
+            return self.validation_cache[1]
+
+    def gpa_projection(self, planned_hours):
+        with self.lock.read():
+            return super().gpa_projection(planned_hours)
+
+    # [(rank, id, name, gpa)] of the `count` best students
+    def top_students(self, count):
+        with self.lock.read():
+            ranking = self.get_ranking()
+            return [(ranking.rank(uid), uid, self.students[uid].name, gpa) for uid, gpa in ranking.top(count)]
+
+    # (rank, ranked students, percentile), or None for a student without credits
+    def student_rank(self, uid):
+        with self.lock.read():
+            ranking = self.get_ranking()
+            rank = ranking.rank(uid)
+            return None if rank is None else (rank, len(ranking), ranking.percentile(uid))
+
+    # The exact ID for a number, otherwise main2's name search
+    def find_by_name(self, query, limit=20):
+        query = query.strip()
+        with self.lock.read():
+            if query.isdigit():
+                student = self.students.get(int(query))
+                return [(student.id, student.name)] if student else []
+            with self.names_lock:
+                return super().find_by_name(query, limit)
 
     def get_student_name(self, uid):
         return self.students[uid].name if uid in self.students else "Unknown"
 
 
+# Most points the trend chart plots; bigger rosters are sampled evenly
+CHART_POINTS = 5000
+
 # STREAMLIT UI (The "Frontend")
 st.set_page_config(page_title="Student Manager", page_icon="🎓", layout="centered")
 st.title("Student Record Management System")
 
-if 'system' not in st.session_state:
-    st.session_state.system = StudentSystem()
+@st.cache_resource
+def get_policies():
+    return load_policies()
 
-system = st.session_state.system
+# Shared by every session in this server process, so memory does not grow with
+# the number of users; one per grading scale, all over the same records
+@st.cache_resource
+def get_system(scale):
+    return StudentSystem(policy=get_policies()[scale])
 
-system.load_data()
+scale = st.sidebar.selectbox("Grading scale", list(get_policies()))
+# A records file that cannot be read stops the page with the reason instead of
+# showing a partial roster
+try:
+    system = get_system(scale)
+    system.refresh()
+except (OSError, ValueError, KeyError) as e:
+    st.error(f"Could not read the student records: {e!r}")
+    st.stop()
 
-tab1, tab2, tab3, tab4 = st.tabs(["Add Student", "Add Grade", "View Records", "AI Predictor"])
+tab1, tab2, tab3, tab4, tab5 = st.tabs(["Add Student", "Add Grade", "View Records", "AI Predictor", "Subject Analytics"])
 
 with tab1:
     st.header("Register New Student")
@@ -124,7 +175,7 @@ with tab1:
     
     if st.button("Save Student", type="primary"):
         if new_name:
-            if system.add_student(new_id, new_name):
+            if system.add_student(Student(new_id, new_name)):
                 st.success(f"Student '{new_name}' added successfully!")
             else:
                 st.error(f"Error: ID {new_id} already exists.")
@@ -133,11 +184,18 @@ with tab1:
 
 with tab2:
     st.header("Log Academic Performance")
-    all_ids = system.get_all_ids()
-    if not all_ids:
+    if not system.students:
         st.info("No students found. Please add a student first.")
     else:
-        selected_id = st.selectbox("Select Student ID", all_ids, format_func=lambda x: f"{x} - {system.get_student_name(x)}")
+        # A handful of matches instead of a dropdown of the whole roster
+        student_query = st.text_input("Find student by name or ID")
+        matches = system.find_by_name(student_query) if student_query.strip() else []
+        if not student_query.strip():
+            st.caption("Type part of a name (typos are fine) or an ID.")
+        elif not matches:
+            st.warning("No matching student.")
+        labels = {uid: f"{uid} - {name}" for uid, name in matches}
+        selected_id = st.selectbox("Select Student", list(labels), format_func=labels.get) if matches else None
         
         c1, c2 = st.columns(2)
         with c1:
@@ -148,26 +206,101 @@ with tab2:
             hours = st.number_input("Hours Studied", min_value=0.0, step=0.5)
 
         if st.button("Add Grade"):
-            if subject:
+            if selected_id is None:
+                st.warning("Please find and select a student first.")
+            elif subject:
                 system.add_grade(selected_id, subject, score, credits, hours)
                 st.success(f"Grade for {subject} added!")
             else:
                 st.warning("Please enter a subject name.")
 
+        st.subheader("Enter Several Grades")
+        st.caption("One row per subject. All rows are saved in a single write, or none if any row is invalid.")
+        # A new key after each save gives the next semester an empty grid
+        grid_version = st.session_state.setdefault("grade_grid_version", 0)
+        rows = st.data_editor(
+            pd.DataFrame({
+                'Subject': pd.Series(dtype='str'),
+                'Score': pd.Series(dtype='float'),
+                'Credits': pd.Series(dtype='float'),
+                'StudyHours': pd.Series(dtype='float'),
+            }),
+            num_rows="dynamic", hide_index=True, key=f"grade_grid_{grid_version}",
+            column_config={
+                'Score': st.column_config.NumberColumn(min_value=0, max_value=100),
+                'Credits': st.column_config.NumberColumn(min_value=0),
+                'StudyHours': st.column_config.NumberColumn("Hours Studied", min_value=0),
+            })
+        if st.button("Save All Grades"):
+            filled = rows.dropna(how='all')
+            if selected_id is None:
+                st.warning("Please find and select a student first.")
+            elif filled.empty:
+                st.warning("Please enter at least one grade.")
+            else:
+                try:
+                    with system.batch() as batch:
+                        for number, row in enumerate(filled.itertuples(index=False), start=1):
+                            hours_studied = math.nan if pd.isna(row.StudyHours) else row.StudyHours
+                            try:
+                                batch.add_grade(selected_id, row.Subject, row.Score, row.Credits, hours_studied)
+                            except ValueError as e:
+                                raise ValueError(f"row {number}: {e}")
+                    st.session_state["grade_grid_version"] = grid_version + 1
+                    st.success(f"{len(batch)} grades saved for student {selected_id}.")
+                except ValueError as e:
+                    st.error(f"Nothing was saved, {e}")
+
 with tab3:
     st.header("Student Records")
     
-    if os.path.exists(system.filename):
-        df = pd.read_csv(system.filename)
+    if system.students:
         st.subheader("GPA Report")
-        for uid, student in system.students.items():
-            gpa = student.calculate_gpa()
-            with st.expander(f"{student.name} (ID: {uid}) - GPA: {gpa:.2f}"):
-                if not student.grades:
-                    st.write("No grades recorded.")
-                else:
-                    student_grades = pd.DataFrame(student.grades)
-                    st.table(student_grades[['Subject', 'Score', 'Credits']])
+        c1, c2 = st.columns([3, 1])
+        with c1:
+            query = st.text_input("Search by ID or name")
+        with c2:
+            page_size = st.selectbox("Per page", [25, 50, 100], index=1)
+
+        # Only the visible page is summarised and sent to the browser
+        matches = system.find_students(query)
+        pages = max(1, -(-len(matches) // page_size))
+        page = st.number_input("Page", min_value=1, max_value=pages, value=1)
+        visible = matches[(page - 1) * page_size:page * page_size]
+
+        with system.lock.read():
+            summary = pd.DataFrame({
+                'ID': [s.id for s in visible],
+                'Name': [s.name for s in visible],
+                'GPA': [round(s.calculate_gpa(), 2) for s in visible],
+                'Courses': [len(s.rows) for s in visible],
+            })
+        st.dataframe(summary, hide_index=True)
+        st.caption(f"{len(matches)} students, page {page} of {pages}")
+
+        if visible:
+            uid = st.selectbox("Show grades for", [s.id for s in visible], format_func=lambda x: f"{x} - {system.get_student_name(x)}")
+            with system.lock.read():
+                grades = system.students[uid].grades
+            if not grades:
+                st.write("No grades recorded.")
+            else:
+                student_grades = pd.DataFrame(grades)
+                st.table(student_grades[['Subject', 'Score', 'Credits']])
+                standing = system.student_rank(uid)
+                if standing:
+                    rank, ranked, percentile = standing
+                    st.caption(f"Class rank {rank} of {ranked} (percentile {percentile:.1f})")
+
+        st.subheader("Class Ranking")
+        top_n = st.number_input("Top students", min_value=1, max_value=1000, value=10)
+        top = system.top_students(top_n)
+        st.dataframe(pd.DataFrame({
+            'Rank': [row[0] for row in top],
+            'ID': [row[1] for row in top],
+            'Name': [row[2] for row in top],
+            'GPA': [round(row[3], 2) for row in top],
+        }), hide_index=True)
     else:
         st.info("No records found.")
 
@@ -175,30 +308,90 @@ with tab4:
     st.header("AI Score Predictor")
     st.write("This model uses **Linear Regression** to predict your score based on study hours.")
 
-    if os.path.exists(system.filename):
-        df = pd.read_csv(system.filename)
-        df_clean = df.dropna(subset=['Score', 'StudyHours'])
+    if system.students:
+        # Fitted incrementally as grades are added, so nothing is refit on a rerun
+        predictor = system.store.predictor
         
-        if len(df_clean) < 5:
-            st.warning(f"Not enough data to train the AI. (Current records: {len(df_clean)}/5 needed)")
+        if not predictor.ready():
+            st.warning(f"Not enough data to train the AI. (Current records: {predictor.n}/{predictor.MIN_RECORDS} needed)")
         else:
-            X = df_clean[['StudyHours']]
-            y = df_clean['Score']
-            model = LinearRegression()
-            model.fit(X, y)
-
             study_input = st.slider("How many hours do you plan to study?", 0, 20, 5)
             
             if st.button("Predict My Score"):
-                prediction = model.predict([[study_input]])
-                predicted_score = min(100, max(0, prediction[0]))
+                with system.lock.read():
+                    prediction = predictor.predict(study_input)
+                predicted_score = min(100, max(0, prediction))
                 
                 st.balloons()
                 st.success(f"Predicted Score: **{predicted_score:.2f}**")
                 
 
                 st.subheader("Study Hours vs. Score Trend")
-                chart_data = df_clean[['StudyHours', 'Score']]
+                # Strided views straight over the grade store: nothing is copied
+                # until the sampled points are serialised for the browser
+                with system.lock.read():
+                    columns = system.store.columns()
+                    step = max(1, len(system.store) // CHART_POINTS)
+                    chart_data = pd.DataFrame({'StudyHours': columns['study_hours'][::step], 'Score': columns['score'][::step]}, copy=False)
                 st.scatter_chart(chart_data, x='StudyHours', y='Score')
+
+            st.subheader("By Subject and Credits")
+            model = system.cohort_model()
+            col1, col2 = st.columns(2)
+            with col1:
+                subject = st.selectbox("Subject", model.subjects)
+            with col2:
+                credits = st.number_input("Credits", min_value=1, max_value=10, value=3)
+            if subject is not None:
+                score = model.predict(study_input, credits, model.subjects.index(subject))
+                st.write(f"Studying {study_input} hours for {subject} ({credits} credits): predicted score **{score:.2f}**")
+
+            st.subheader("Projected Next-Term GPA")
+            st.caption("Every student retaking their current subjects and credits, studying the same hours for each.")
+            planned = st.multiselect("Planned study hours per subject", list(range(21)), default=[0, 5, 10, 15, 20])
+            if planned:
+                planned = sorted(planned)
+                # One vectorized pass over every grade for all the planned hours at once
+                current, projected = system.gpa_projection(planned)
+                if len(current):
+                    st.write(f"Average GPA now: **{current.mean():.2f}** over {len(current):,} students")
+                    st.dataframe(pd.DataFrame({
+                        'Hours per subject': planned,
+                        'Average GPA': projected.mean(axis=0).round(2),
+                        'Median GPA': pd.DataFrame(projected).median().round(2),
+                        'GPA 3.0 or more': [f'{share:.0%}' for share in (projected >= 3.0).mean(axis=0)],
+                        'Improving': [f'{share:.0%}' for share in (projected > current[:, None]).mean(axis=0)],
+                    }), hide_index=True)
+
+            st.subheader("Model Quality")
+            folds = st.select_slider("Cross-validation folds", options=[3, 5, 10], value=5)
+            # Saved with the model, so it only runs again once grades change
+            report = system.cross_validation(folds)
+            if report is None:
+                st.info(f"Not enough grades for {folds}-fold cross-validation.")
+            else:
+                st.caption(f"{report['folds']}-fold cross-validation over {report['grades']:,} grades; "
+                           "lower RMSE/MAE and higher R² are better.")
+                summary = summarize(report)
+                st.dataframe(pd.DataFrame({
+                    'Model': [row[0] for row in summary],
+                    'RMSE': [round(row[1], 2) for row in summary],
+                    'MAE': [round(row[2], 2) for row in summary],
+                    'R²': [round(row[3], 3) for row in summary],
+                }), hide_index=True)
+    else:
+        st.error("No database found.")
+
+with tab5:
+    st.header("Subject Analytics")
+    subjects, letters = system.grade_report()
+    if not len(letters['Letter']):
+        st.info("No grades recorded yet.")
     else:
-        st.error("No database found.")
\ No newline at end of file
+        st.subheader("By Subject")
+        st.dataframe(pd.DataFrame(subjects), hide_index=True,
+                     column_config={'Pass rate': st.column_config.NumberColumn(format='percent')})
+        st.subheader("Grade Distribution")
+        by_letter = pd.DataFrame(letters)
+        st.bar_chart(by_letter, x='Letter', y='Count', sort=False)
+        st.dataframe(by_letter, hide_index=True)
\ No newline at end of file